@@ -17,13 +17,10 @@ release = 'v0.1.0'
 extensions = [
     'sphinx.ext.autodoc',
     'sphinx.ext.napoleon',   # supporta Google e NumPy style
-    'numpydoc'
 ]
 
-numpydoc_show_class_members = False
-
 templates_path = ['_templates']
-exclude_patterns = []
+exclude_patterns = ['_build', 'build', 'Thumbs.db', '.DS_Store']
 
 
 
@@ -35,6 +32,34 @@ html_static_path = ['_static']
 
 import os
 import sys
+import types
+
+
+class _LightModule(types.ModuleType):
+    """
+    Ultra-light stand-in for heavy third-party modules.
+
+    Unlike autodoc's mock objects, attribute access is a plain method call
+    that returns another light module, so walking modules with many
+    ``from x import a, b, c`` imports stays cheap.
+    """
+
+    def __getattr__(self, name):
+        if name.startswith('__'):
+            raise AttributeError(name)
+        return _LightModule(f"{self.__name__}.{name}")
+
+    def __call__(self, *args, **kwargs):
+        return _LightModule(f"{self.__name__}()")
+
+    def __repr__(self):
+        return self.__name__
+
+
+# Pre-seeding di sys.modules per le dipendenze più pesanti (al posto di autodoc_mock_imports)
+for _name in ('qdrant_client', 'qdrant_client.models', 'qdrant_client.http', 'qdrant_client.http.models'):
+    sys.modules.setdefault(_name, _LightModule(_name))
+
 sys.path.insert(0, os.path.abspath('../..'))
 
 autodoc_mock_imports = [
@@ -53,13 +78,29 @@ autodoc_mock_imports = [
     'pydantic',
     'ragas',
     'ragas.metrics',
-    'faiss',
     'streamlit',
-    'litellm',
-    'sentence_transformers',
     'numpy',
     'pandas',
-    'qdrant_client',
-    'qdrant_client.models',
-    'qdrant_client.http.models'
-]
\ No newline at end of file
+    'requests',
+    'requests.adapters',
+    'urllib3',
+    'urllib3.util.retry',
+    'dotenv',
+    'yaml',
+    'bs4',
+    'duckduckgo_search',
+    'fitz'
+]
+
+
+def setup(app):
+    """
+    Declare this configuration safe for parallel builds.
+
+    Lets ``sphinx-build -j auto`` (the default in the Makefile) split the
+    read and write phases across processes.
+    """
+    return {
+        'parallel_read_safe': True,
+        'parallel_write_safe': True,
+    }
@@ -0,0 +1,5 @@
+from dotenv import load_dotenv
+
+# Carica le variabili d'ambiente una sola volta per processo, senza
+# sovrascrivere quelle già presenti in os.environ
+load_dotenv(override=False)
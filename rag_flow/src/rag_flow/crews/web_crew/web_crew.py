@@ -1,19 +1,36 @@
-from crewai import Agent, Crew, Process, Task
+from __future__ import annotations
+
 from crewai.project import CrewBase, agent, crew, task
-from crewai.agents.agent_builder.base_agent import BaseAgent
-from typing import List
-from crewai_tools import SerperDevTool
-from rag_flow.tools.custom_tool import TrustedWebSearch
+from typing import List, TYPE_CHECKING
+import functools
 import os
+from pathlib import Path
 import ssl
 import urllib3
+import warnings
 import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
-from dotenv import load_dotenv
+if TYPE_CHECKING:
+    from crewai import Agent, Crew, Task
+    from crewai.agents.agent_builder.base_agent import BaseAgent
+
+# Contesto SSL non verificato creato una sola volta e condiviso da tutti i pool
+# (urllib3 lo usa in sola lettura per creare le connessioni)
+_UNVERIFIED_SSL_CONTEXT = ssl._create_unverified_context()
 
-load_dotenv()
+# Policy di retry per la sola sessione Serper: urllib3 ripete le chiamate
+# fallite (429/5xx) senza che l'errore risalga al chiamante. POST è incluso
+# perché la ricerca Serper è una query in sola lettura, quindi ripeterla è
+# sicuro; le altre sessioni del processo non montano questo adapter.
+# Retry è immutabile, quindi un'unica istanza può essere condivisa.
+_SERPER_RETRY = Retry(
+    total=5,
+    backoff_factor=0.25,
+    status_forcelist=(429, 500, 502, 503, 504),
+    allowed_methods=frozenset({"GET", "POST"}),
+)
 
 # Configure requests session to bypass SSL issues
 class NoSSLHTTPAdapter(HTTPAdapter):
@@ -29,12 +46,41 @@ class NoSSLHTTPAdapter(HTTPAdapter):
     init_poolmanager(*args, **kwargs)
         Initialize the pool manager with SSL verification disabled
     """
+    def __init__(self, pool_connections=32, pool_maxsize=64, pool_block=False, max_retries=None):
+        """
+        Initialize the adapter with larger connection pools and a retry policy.
+        
+        Parameters
+        ----------
+        pool_connections : int, default=32
+            Number of host pools to cache
+        pool_maxsize : int, default=64
+            Maximum number of connections kept alive per host pool, so
+            concurrent calls to the same host (e.g. google.serper.dev)
+            reuse connections instead of opening new ones
+        pool_block : bool, default=False
+            Whether the pool should block when no free connections are available
+        max_retries : Retry or int, optional
+            Retry policy; defaults to the Serper policy (5 retries with
+            backoff on 429/5xx responses, GET and POST). The adapter is only
+            mounted on the Serper session, so non-idempotent POSTs of other
+            clients are never retried
+        """
+        if max_retries is None:
+            max_retries = _SERPER_RETRY
+        super().__init__(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            max_retries=max_retries,
+            pool_block=pool_block,
+        )
+
     def init_poolmanager(self, *args, **kwargs):
         """
         Initialize the connection pool manager with SSL verification disabled.
         
         This method overrides the default pool manager initialization to use
-        an unverified SSL context, effectively disabling SSL certificate
+        the shared unverified SSL context, effectively disabling SSL certificate
         verification for all requests made through this adapter.
         
         Parameters
@@ -43,86 +89,56 @@ class NoSSLHTTPAdapter(HTTPAdapter):
             Variable length argument list passed to parent init_poolmanager
         **kwargs : dict
             Arbitrary keyword arguments passed to parent init_poolmanager.
-            The 'ssl_context' key will be overridden with unverified context
+            The 'ssl_context' key will be overridden with the shared unverified context
             
         Returns
         -------
         object
             The initialized pool manager object from the parent class
         """
-        kwargs['ssl_context'] = ssl._create_unverified_context()
+        kwargs['ssl_context'] = _UNVERIFIED_SSL_CONTEXT
         return super().init_poolmanager(*args, **kwargs)
 
-# Monkey patch requests to use our custom adapter
-original_request = requests.Session.request
-def patched_request(self, *args, **kwargs):
+def _serper_session():
     """
-    Patched version of requests.Session.request that disables SSL verification.
+    Build the HTTP session used for the Serper API calls only.
     
-    This function monkey-patches the requests Session object to automatically
-    mount the NoSSLHTTPAdapter for HTTPS requests and disable SSL verification
-    by default. It maintains the original functionality while adding SSL bypass.
+    The NoSSLHTTPAdapter (unverified TLS, shared retry policy) is mounted on
+    this session alone; ``requests.Session``, ``requests.request`` and every
+    other session in the process keep their default, verified behaviour.
     
-    Parameters
-    ----------
-    self : requests.Session
-        The requests Session instance being patched
-    *args : tuple
-        Variable length argument list passed to original request method
-    **kwargs : dict
-        Arbitrary keyword arguments passed to original request method.
-        The 'verify' key will be set to False if not explicitly provided
-        
     Returns
     -------
-    requests.Response
-        The response object returned by the original request method
+    requests.Session
+        New session with SSL verification disabled for HTTPS requests
     """
-    if not hasattr(self, '_no_ssl_mounted'):
-        self.mount('https://', NoSSLHTTPAdapter())
-        self._no_ssl_mounted = True
-    kwargs.setdefault('verify', False)
-    return original_request(self, *args, **kwargs)
-
-requests.Session.request = patched_request
-
-# Also patch the main requests module
-original_requests_request = requests.request
-def patched_requests_request(*args, **kwargs):
-    """
-    Patched version of the main requests.request function with SSL verification disabled.
-    
-    This function monkey-patches the main requests module's request function
-    to automatically disable SSL verification for all requests made through
-    the requests.request() function directly (not through a Session object).
-    
-    Parameters
-    ----------
-    *args : tuple
-        Variable length argument list passed to original request function
-    **kwargs : dict
-        Arbitrary keyword arguments passed to original request function.
-        The 'verify' key will be set to False if not explicitly provided
-        
-    Returns
-    -------
-    requests.Response
-        The response object returned by the original request function
-    """
-    kwargs.setdefault('verify', False)
-    return original_requests_request(*args, **kwargs)
-
-requests.request = patched_requests_request
+    session = requests.Session()
+    session.mount('https://', NoSSLHTTPAdapter())
+    session.verify = False
+    return session
 
 # If you want to run a snippet of code before or after the crew starts,
 # you can use the @before_kickoff and @after_kickoff decorators
 # https://docs.crewai.com/concepts/crews#example-crew-class-with-decorators
-# Disable SSL verification for Serper API
-ssl._create_default_https_context = ssl._create_unverified_context
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+# La verifica TLS è disattivata solo sulla sessione Serper (_serper_session):
+# il contesto HTTPS di default del processo resta quello verificato, e
+# l'avviso InsecureRequestWarning è silenziato solo per l'host Serper.
+# globals() sopravvive a importlib.reload, quindi il filtro non viene riaggiunto
+if not globals().get("_WARNINGS_DISABLED"):
+    warnings.filterwarnings(
+        "ignore",
+        message=r".*'google\.serper\.dev'",
+        category=urllib3.exceptions.InsecureRequestWarning,
+    )
+    _WARNINGS_DISABLED = True
+
+# Valori risolti una sola volta al caricamento del modulo (il .env è già
+# stato caricato dal package rag_flow)
+_SERPER_API_KEY = os.environ.get("SERPER_API_KEY")
+_CONFIG_DIR = Path(__file__).parent / "config"
+_AGENTS_CFG = str(_CONFIG_DIR / "agents.yaml")
+_TASKS_CFG = str(_CONFIG_DIR / "tasks.yaml")
 
-# web_search_tool = SerperDevTool(api_key=os.getenv("SERPER_API_KEY"), n_results=5)
-web_search_tool = TrustedWebSearch(api_key=os.getenv("SERPER_API_KEY"), n_results=10)
 
 @CrewBase
 class WebCrew():
@@ -147,8 +163,31 @@ class WebCrew():
     # Learn more about YAML configuration files here:
     # Agents: https://docs.crewai.com/concepts/agents#yaml-configuration-recommended
     # Tasks: https://docs.crewai.com/concepts/tasks#yaml-configuration-recommended
-    agents_config = "config/agents.yaml"
-    tasks_config = "config/tasks.yaml"
+    agents_config = _AGENTS_CFG
+    tasks_config = _TASKS_CFG
+
+    @classmethod
+    @functools.lru_cache(maxsize=None)
+    def _tool(cls):
+        """
+        Build the trusted web search tool on first use and share it afterwards.
+        
+        The tool is not created at import time, so importing this module
+        (e.g. during Sphinx autodoc collection) does not pull in the tool's
+        heavy dependencies or initialize the SerperDev client. Its Serper
+        calls go through a dedicated session (see ``_serper_session``). The instance
+        is cached per class, so every crew built in the same process (e.g.
+        in batched evaluations) reuses it, while subclasses overriding this
+        method get their own.
+        
+        Returns
+        -------
+        TrustedWebSearch
+            Shared TrustedWebSearch instance configured with 10 results
+        """
+        from rag_flow.tools.custom_tool import TrustedWebSearch
+
+        return TrustedWebSearch(api_key=_SERPER_API_KEY, n_results=10, session=_serper_session())
     
     # If you would like to add tools to your agents, you can learn more about it here:
     # https://docs.crewai.com/concepts/agents#agent-tools
@@ -165,6 +204,8 @@ class WebCrew():
         Agent
             Configured web analyst agent with web search capabilities
         """
+        from crewai import Agent
+
         return Agent(
             config=self.agents_config["web_analyst"],  # type: ignore[index]
         )
@@ -186,9 +227,11 @@ class WebCrew():
         Task
             Configured web analysis task with SerperDevTool for web searching
         """
+        from crewai import Task
+
         return Task(
             config=self.tasks_config["web_analysis_task"],  # type: ignore[index]
-            tools=[web_search_tool],  # Usa il tool definito con @tool
+            tools=[self._tool()],  # Usa il tool definito con @tool
         )
 
     @crew
@@ -206,6 +249,7 @@ class WebCrew():
         """
         # To learn how to add knowledge sources to your crew, check out the documentation:
         # https://docs.crewai.com/concepts/knowledge#what-is-knowledge
+        from crewai import Crew, Process
 
         return Crew(
             agents=self.agents, # Automatically created by the @agent decorator
@@ -1,26 +1,37 @@
 #!/usr/bin/env python
 from pydantic import BaseModel
-from crewai.flow import Flow, listen, start, router
-from rag_flow.crews.bias_crew.bias_crew import BiasCrew
-from rag_flow.crews.rag_crew.rag_crew import AeronauticRagCrew
-from rag_flow.crews.web_crew.web_crew import WebCrew
-from rag_flow.crews.doc_crew.doc_crew import DocCrew
+from crewai.flow import Flow, listen, start, router, or_
 import os
-from langchain_openai import AzureChatOpenAI
-from typing import Dict, Any
-from opik import configure 
-from opik.integrations.crewai import track_crewai 
+import asyncio
+import functools
+import json
+import re
+import sys
 
-configure(use_local=True) 
-
-os.environ["CURL_CA_BUNDLE"] = ""
-os.environ["REQUESTS_CA_BUNDLE"] = ""
-os.environ["SSL_VERIFY"] = "false"
-os.environ["PYTHONHTTPSVERIFY"] = "0"
+# La verifica TLS resta attiva: dietro un proxy aziendale impostare
+# REQUESTS_CA_BUNDLE / SSL_CERT_FILE sul certificato della CA interna
 os.environ["OTEL_SDK_DISABLED"] = "true"
 
 
-track_crewai(project_name="final_project") 
+@functools.lru_cache(maxsize=1)
+def _setup_tracing():
+    """
+    Configure Opik and instrument CrewAI, once per process.
+    
+    Tracing is set up when a flow actually runs rather than at import time,
+    so entry points that execute no crew (e.g. ``plot``) do not pay for
+    importing and configuring Opik. Setting ``OPIK_ENABLED=0`` skips the
+    instrumentation entirely, removing the per-call trace serialization
+    and writes to the local Opik server (fast mode).
+    """
+    if os.getenv("OPIK_ENABLED", "1") != "1":
+        return
+
+    from opik import configure
+    from opik.integrations.crewai import track_crewai
+
+    configure(use_local=True)
+    track_crewai(project_name="final_project")
 
 
 endpoint = os.getenv("AZURE_API_BASE")
@@ -28,6 +39,145 @@ key = os.getenv("AZURE_API_KEY")
 model_name = os.getenv("AZURE_MODEL")  
 api_version=os.getenv("AZURE_API_VERSION", "2024-06-01")
 
+# Prompt di sistema costanti: restano identici byte per byte tra le chiamate
+# e vengono sempre inviati come primo messaggio, così il prefisso comune
+# può essere riutilizzato dalla cache dei prompt di Azure OpenAI
+VALIDATION_SYSTEM_PROMPT = """You are an expert in aeronautics and an ethical AI expert specialized in content moderation.
+Your role is to evaluate user questions against two independent criteria.
+AERONAUTIC: the question is relevant to aeronautics.
+ETHICAL: the question is appropriate and ethical.
+Consider a question ETHICAL if it:
+- Seeks legitimate information
+- Has educational or professional purpose
+- Does not promote harm, violence, or illegal activities
+- Does not involve personal attacks or hate speech
+Consider a question UNETHICAL if it:
+- Requests harmful, dangerous, or illegal information
+- Contains hate speech, discrimination, or personal attacks
+- Aims to manipulate, deceive, or cause harm
+- Violates privacy or confidentiality
+Be permissive with legitimate academic, technical, or professional questions.
+Answer only with a JSON object of the form {"aeronautic": true|false, "ethical": true|false}."""
+
+
+# Screening rapido opzionale prima del BiasCrew (BIAS_SCREEN_ENABLED=1):
+# riferimenti a gruppi sociali, culture o stereotipi (in inglese e italiano).
+# Una lista di parole non copre ogni forma di bias (età, pronomi di genere,
+# ...), quindi per default il BiasCrew gira sempre.
+_BIAS_SCREEN_RE = re.compile(
+    r"\b(?:"
+    r"wom[ae]n|men|male|female|gender\w*|sex(?:ism|ist)?|"
+    r"rac(?:e|es|ial\w*|is[mt]\w*)|ethnic\w*|religio\w*|nationalit\w*|"
+    r"foreigner\w*|immigra\w*|cultur\w*|stereotyp\w*|minorit\w*|"
+    r"elderly|disab\w*|"
+    r"donn[ae]|uomini|gener[ei]|razz[ae]|razzi\w*|etni\w*|religios\w*|nazionalit\w*|"
+    r"stranier\w*|immigrat\w*|cultural\w*|stereotip\w*|minoranz\w*|anzian\w*|disabil\w*"
+    r")\b",
+    re.IGNORECASE,
+)
+
+@functools.lru_cache(maxsize=1)
+def _validator_llm():
+    """
+    Build the Azure OpenAI client used by the question validators.
+    
+    The client is created on first use and shared afterwards, so the
+    configuration is validated once and the underlying HTTP connection
+    pool stays alive across validation calls and flow runs. The sync and
+    async httpx clients keep up to 32 idle connections for 60 s and
+    negotiate HTTP/2 when the optional ``h2`` package is installed
+    (``pip install httpx[http2]``), so concurrent calls share one TLS session.
+    
+    Returns
+    -------
+    AzureChatOpenAI
+        Shared deterministic client (temperature 0, 2 retries, at most
+        60 output tokens) in JSON mode
+    """
+    import importlib.util
+    import httpx
+    from langchain_openai import AzureChatOpenAI
+
+    http2 = importlib.util.find_spec("h2") is not None
+    limits = httpx.Limits(max_keepalive_connections=32, keepalive_expiry=60)
+    return AzureChatOpenAI(
+        azure_deployment=model_name,
+        api_version=api_version,
+        temperature=0,
+        max_retries=2,
+        # il verdetto compatto occupa ~13 token; margine per spazi e a capo
+        # così un JSON formattato non viene troncato
+        max_tokens=60,
+        model_kwargs={"response_format": {"type": "json_object"}},
+        http_client=httpx.Client(http2=http2, limits=limits),
+        http_async_client=httpx.AsyncClient(http2=http2, limits=limits),
+    )
+
+
+def _parse_verdict(content):
+    """
+    Parse the JSON verdict returned by the validator.
+    
+    Parameters
+    ----------
+    content : str
+        Raw message content produced by the validator LLM
+        
+    Returns
+    -------
+    dict or None
+        The verdict object, or None if the content is not valid JSON or not
+        a JSON object (e.g. a truncated answer or a list)
+    """
+    try:
+        verdict = json.loads(content)
+    except (TypeError, ValueError):
+        return None
+    return verdict if isinstance(verdict, dict) else None
+
+
+# Crew costruite una sola volta per processo: YAML, agenti, LLM e tool
+# non vengono ricreati a ogni esecuzione del flow
+@functools.lru_cache(maxsize=1)
+def _aero_crew():
+    """Return the shared AeronauticRagCrew crew, built on first use."""
+    from rag_flow.crews.rag_crew.rag_crew import AeronauticRagCrew
+
+    return AeronauticRagCrew().crew()
+
+
+@functools.lru_cache(maxsize=1)
+def _web_crew():
+    """Return the shared WebCrew crew, built on first use."""
+    from rag_flow.crews.web_crew.web_crew import WebCrew
+
+    return WebCrew().crew()
+
+
+@functools.lru_cache(maxsize=1)
+def _doc_crew():
+    """Return the shared DocCrew crew, built on first use."""
+    from rag_flow.crews.doc_crew.doc_crew import DocCrew
+
+    return DocCrew().crew()
+
+
+@functools.lru_cache(maxsize=1)
+def _bias_crew():
+    """Return the shared BiasCrew crew, built on first use."""
+    from rag_flow.crews.bias_crew.bias_crew import BiasCrew
+
+    return BiasCrew().crew()
+
+
+@functools.lru_cache(maxsize=1)
+def _response_cache():
+    """Return the shared semantic response cache, loaded on first use."""
+    from rag_flow.response_cache import SemanticResponseCache
+    from rag_flow.tools.rag_w_qdrant.main import corpus_fingerprint, embed_query
+
+    return SemanticResponseCache(embed_query, version=corpus_fingerprint)
+
 
 class AeronauticRagState(BaseModel):
     """
@@ -41,19 +191,31 @@ class AeronauticRagState(BaseModel):
     ----------
     question_input : str
         User's input question about aeronautics (default: "")
+    interactive : bool
+        Whether a rejected question is asked again on the console (default: True)
     rag_result : str
         Result from RAG system analysis using local document knowledge base (default: "")
     web_result : str
         Result from web search and analysis using external sources (default: "")
     all_results : str
         Aggregated results combining RAG and web analysis outputs (default: "")
+    document : str
+        Document generated by DocCrew from the aggregated results (default: "")
+    final_doc : str
+        Bias-checked final document (default: "")
+    rag_context : str
+        Context retrieved by the RAG tool for the question (default: "")
         
     Notes
     -----
     State persistence enables tracking of data flow between different crew executions
     and allows for comprehensive result aggregation and document generation.
+    Flow steps exchange data only through these fields: no step returns a
+    payload, so crew objects and intermediate strings are not kept alive by
+    the flow's method outputs.
     """
     question_input: str = ""
+    interactive: bool = True
     rag_result: str = ""
     web_result: str = ""
     all_results: str = ""
@@ -73,10 +235,11 @@ class AeronauticRagFlow(Flow[AeronauticRagState]):
     -----------------
     1. **Starting Procedure**: Initialize flow execution
     2. **Question Generation**: Capture user input for aeronautic queries
-    3. **Question Analysis**: Validate aeronautic relevance using Azure OpenAI
-    4. **RAG Analysis**: Local document-based knowledge retrieval and answer generation
-    5. **Web Analysis**: External web search for complementary information
-    6. **Result Aggregation**: Combine and synthesize all findings into comprehensive documentation
+    3. **Question Analysis**: Validate aeronautic relevance and ethics with a single Azure OpenAI call,
+       then reuse the cached document of a near-identical question if there is one
+    4. **Retrieval**: Local document-based RAG analysis and external web search, run concurrently
+    5. **Result Aggregation**: Combine and synthesize all findings into comprehensive documentation
+    6. **Bias Check**: Review the generated document for potential biases
     7. **Plot Generation**: Visualize the flow execution graph
     
     Crew Integration
@@ -93,8 +256,11 @@ class AeronauticRagFlow(Flow[AeronauticRagState]):
     Routing Logic
     -------------
     Implements intelligent routing based on question relevance:
-    - 'success': Question is aeronautic-relevant, proceed with full analysis
-    - 'retry': Question lacks aeronautic context, restart question capture
+    - 'success-ethical': Question is aeronautic-relevant and ethical, proceed with full analysis
+    - 'retry': Question lacks aeronautic context or is unethical, restart question capture
+    - 'rejected': Same as 'retry' in non-interactive runs, where the flow ends instead
+    - 'cache-hit' / 'cache-miss': Whether a validated question is answered from
+      the semantic response cache or by the crews
     
     Notes
     -----
@@ -104,6 +270,28 @@ class AeronauticRagFlow(Flow[AeronauticRagState]):
     - Includes flow visualization capabilities for pipeline monitoring
     """
 
+    # Con più flow in esecuzione concorrente ogni flow lavora su una copia
+    # delle crew condivise (Crew.kickoff modifica task e agenti)
+    isolated_crews = False
+
+    def _crew(self, factory):
+        """
+        Return the crew built by ``factory``, copied if this flow runs concurrently with others.
+        
+        Parameters
+        ----------
+        factory : Callable[[], Crew]
+            One of the cached crew builders
+            
+        Returns
+        -------
+        Crew
+            The shared crew, or a private ``Crew.copy()`` of it when
+            ``isolated_crews`` is set
+        """
+        crew = factory()
+        return crew.copy() if self.isolated_crews else crew
+
     @start('retry')
     def starting_procedure(self):
         """
@@ -115,8 +303,10 @@ class AeronauticRagFlow(Flow[AeronauticRagState]):
         Notes
         -----
         The 'retry' parameter enables automatic restart when question validation
-        determines that the input is not relevant to aeronautics.
+        determines that the input is not relevant to aeronautics. Opik tracing
+        is configured here on the first run (no-op afterwards).
         """
+        _setup_tracing()
 
     @listen(starting_procedure)
     def generate_question(self):
@@ -128,7 +318,8 @@ class AeronauticRagFlow(Flow[AeronauticRagState]):
         
         State Updates
         -------------
-        Updates self.state.question_input with the user's entered question.
+        Updates self.state.question_input with the user's entered question,
+        unless a question was already provided through ``kickoff(inputs=...)``.
         
         Notes
         -----
@@ -136,38 +327,43 @@ class AeronauticRagFlow(Flow[AeronauticRagState]):
         The captured question will be validated for aeronautic relevance in
         the next flow stage.
         """
+        if self.state.question_input:
+            return
         question = input("Enter your question about aeronautics: ")
         self.state.question_input = question
        
 
     @router(generate_question)
-    def aeronautic_question_analysis(self):
+    async def validate_question(self):
         """
-        Validate question relevance to aeronautics using Azure OpenAI.
+        Validate question relevance to aeronautics and its ethics using Azure OpenAI.
         
-        Analyzes the user's question to determine if it's relevant to aeronautics
-        using Azure OpenAI GPT-4o model. Routes the flow based on validation results
-        to ensure only aeronautic questions proceed to full analysis.
+        Both criteria are evaluated by a single structured-output call, so
+        validation costs one round-trip and the question is sent only once.
         
         Returns
         -------
         str
             Routing decision:
-            - "success": Question is aeronautic-relevant, proceed with analysis
-            - "retry": Question is not aeronautic-relevant, restart question capture
+            - "success-ethical": Question is aeronautic-relevant and ethical, proceed with analysis
+            - "retry": Question failed at least one check, restart question capture
+            - "rejected": Question failed in a non-interactive run, end the flow
             
         LLM Configuration
         ----------------
-        - Model: Azure OpenAI GPT-4o
+        - Model: Azure OpenAI GPT-4o (shared client, see ``_validator_llm``)
         - Temperature: 0 (deterministic responses)
         - Max Retries: 2 (robust error handling)
+        - Max Tokens: 60 (the verdict plus room for whitespace)
+        - Response Format: JSON object
         - API Version: From environment variable AZURE_API_VERSION
         
         Validation Logic
         ---------------
-        Uses a system prompt defining the AI as an aeronautics expert and asks
-        for binary True/False validation of question relevance. Response parsing
-        is case-insensitive and searches for 'true' substring.
+        The model answers with ``{"aeronautic": bool, "ethical": bool}``; the
+        question proceeds only if both flags are true. An answer that is not
+        a JSON object is a validator error, not a rejection: the call is
+        retried once, then a RuntimeError is raised.
         
         Environment Dependencies
         -----------------------
@@ -177,209 +373,114 @@ class AeronauticRagFlow(Flow[AeronauticRagState]):
         Notes
         -----
         This routing mechanism ensures the RAG system only processes relevant
-        queries, improving efficiency and result quality by filtering out
-        off-topic questions early in the pipeline.
+        and appropriate queries, filtering out off-topic or harmful questions
+        early in the pipeline.
         """
-        llm = AzureChatOpenAI(
-            azure_deployment=model_name,  
-        api_version=api_version,  
-        temperature=0,
-        max_retries=2,
-        ) 
         messages=[
-                {"role": "system", "content": "You are an expert in aeronautics."},
-                {"role": "user", "content": f"Is the following question relevant to aeronautics? Question: {self.state.question_input}. Answer only with 'True' or 'False'"}
+                {"role": "system", "content": VALIDATION_SYSTEM_PROMPT},
+                {"role": "user", "content": f"Question: {self.state.question_input}"}
             ]
-        
-        res = llm.invoke(messages)
-        res = res.content.strip().lower()
+        verdict = None
+        for _ in range(2):
+            res = await _validator_llm().ainvoke(messages)
+            verdict = _parse_verdict(res.content)
+            if verdict is not None:
+                break
+        if verdict is None:
+            raise RuntimeError(f"Validator returned an invalid verdict: {res.content!r}")
 
-        if 'true' in res:
-            return "success"
-        else:
+        if verdict.get("aeronautic") is not True:
             print("Question not relevant to aeronautics, please try again.")
-            return "retry"
+        elif verdict.get("ethical") is not True:
+            print("Question not ethical, please try again.")
+        else:
+            return "success-ethical"
 
+        if not self.state.interactive:
+            return "rejected"
+        self.state.question_input = ""
+        return "retry"
 
-    @router("success")
-    def ethic_question_analysis(self):
+    @router("success-ethical")
+    async def check_response_cache(self):
         """
-        Validate question relevance to aeronautics using Azure OpenAI.
+        Reuse the document of a previously answered, near-identical question.
         
-        Analyzes the user's question to determine if it's relevant to aeronautics
-        using Azure OpenAI GPT-4o model. Routes the flow based on validation results
-        to ensure only aeronautic questions proceed to full analysis.
+        Looks the validated question up in the semantic response cache
+        (exact match first, then cosine similarity >= 0.97 between question
+        embeddings). Only questions that passed validation are cached, and
+        the lookup runs after validation, so a hit always has the same
+        validation outcome.
         
         Returns
         -------
         str
             Routing decision:
-            - "success": Question is aeronautic-relevant, proceed with analysis
-            - "retry": Question is not aeronautic-relevant, restart question capture
+            - "cache-hit": self.state.final_doc was filled from the cache, skip the crews
+            - "cache-miss": proceed with retrieval
             
-        LLM Configuration
-        ----------------
-        - Model: Azure OpenAI GPT-4o
-        - Temperature: 0 (deterministic responses)
-        - Max Retries: 2 (robust error handling)
-        - API Version: From environment variable AZURE_API_VERSION
-        
-        Validation Logic
-        ---------------
-        Uses a system prompt defining the AI as an aeronautics expert and asks
-        for binary True/False validation of question relevance. Response parsing
-        is case-insensitive and searches for 'true' substring.
-        
-        Environment Dependencies
-        -----------------------
-        Requires AZURE_API_BASE, AZURE_API_KEY, MODEL, and AZURE_API_VERSION
-        environment variables for Azure OpenAI service connection.
-        
         Notes
         -----
-        This routing mechanism ensures the RAG system only processes relevant
-        queries, improving efficiency and result quality by filtering out
-        off-topic questions early in the pipeline.
+        The question embedding computed here is kept in the retriever's
+        query cache, so on a miss the RAG search does not embed it again.
+        Delete output/response_cache.jsonl to clear the cache, e.g. after
+        the document corpus changes.
         """
-        llm = AzureChatOpenAI(
-            azure_deployment=model_name,  
-        api_version=api_version,  
-        temperature=0,
-        max_retries=2,
-        ) 
-        messages=[{"role": "system", "content":
-                """You are an ethical AI expert specialized in content moderation. 
-                Your role is to evaluate if questions are appropriate and ethical.
-                Consider a question ETHICAL if it:
-                - Seeks legitimate information
-                - Has educational or professional purpose
-                - Does not promote harm, violence, or illegal activities
-                - Does not involve personal attacks or hate speech
-                Consider a question UNETHICAL if it:
-                - Requests harmful, dangerous, or illegal information
-                - Contains hate speech, discrimination, or personal attacks
-                - Aims to manipulate, deceive, or cause harm
-                - Violates privacy or confidentiality
-                Be permissive with legitimate academic, technical, or professional questions."""
-                },
-                {"role": "user", "content": f"Is the following question ethical or harmful? Question: {self.state.question_input}. Answer only with 'True' or 'False'"}
-            ]
-        
-        res = llm.invoke(messages)
-        res = res.content.strip().lower()
+        cached = await asyncio.to_thread(_response_cache().lookup, self.state.question_input)
+        if cached is None:
+            return "cache-miss"
+        print("Answer found in the response cache.")
+        self.state.final_doc = cached
+        return "cache-hit"
 
-        if 'true' in res:
-            return "success-ethical"
-        else:
-            print("Question not ethical, please try again.")
-            return "retry"
-
-    @listen("success-ethical")
-    def rag_analysis(self):
-        """
-        Execute RAG-based analysis using local aeronautic knowledge base.
-        
-        Processes the validated aeronautic question through the AeronauticRagCrew,
-        which uses FAISS vector store and Azure OpenAI embeddings to retrieve
-        relevant context from local documents and generate comprehensive answers.
-        
-        Crew Execution
-        -------------
-        - Crew: AeronauticRagCrew (rag_expert agent with rag_system tool)
-        - Input: User's validated aeronautic question
-        - Processing: Vector similarity search + context-aware answer generation
-        - Output: RAG-generated response with source citations
-        
-        State Updates
-        -------------
-        Updates self.state.rag_result with the raw output from the RAG crew execution.
-        
-        Knowledge Base
-        --------------
-        Utilizes local FAISS vector store containing aeronautic documentation,
-        technical manuals, and domain-specific knowledge for accurate,
-        context-grounded responses.
-        
-        Answer Quality
-        --------------
-        - Source citations for transparency and verification
-        - Anti-hallucination safeguards through context-only responses
-        - Technical accuracy through domain-specific knowledge base
-        - RAGAS evaluation metrics for quality assessment
-        
-        Notes
-        -----
-        This is the primary knowledge retrieval stage that leverages local
-        expertise. Results are complemented by web analysis in the next stage
-        for comprehensive coverage.
+    @listen("cache-miss")
+    async def retrieve(self):
         """
-        aero_crew = AeronauticRagCrew().crew()
-        result = (
-            aero_crew.kickoff(inputs={"question": self.state.question_input,
-                             })
-        )
-        with open("output/last_context.txt", "r", encoding="utf-8") as f:
-            CONTEXT = f.read()
-        self.state.rag_result = result.raw
-        return {
-            "aero_crew": aero_crew,
-            "rag_context": CONTEXT,
-            "rag_result": result.raw,
-            "question": self.state.question_input
-        }
-    
-    @listen(rag_analysis)
-    def web_analysis(self, payload:Dict[str, Any]):
-        """
-        Execute web-based analysis to complement local knowledge base.
+        Execute RAG-based and web-based analysis concurrently.
         
-        Processes the aeronautic question through WebCrew to gather external
-        information from web sources, providing broader context and current
-        information that may not be available in local documentation.
+        The two crews only depend on the validated question, so they are
+        started together with ``kickoff_async`` and awaited with
+        ``asyncio.gather``; the retrieval stage takes as long as the slower
+        crew instead of the sum of both.
         
         Crew Execution
         -------------
-        - Crew: WebCrew (web_analyst agent with SerperDevTool)
+        - AeronauticRagCrew (rag_expert agent with rag_system tool): vector
+          similarity search on the local knowledge base + context-aware answer
+          generation with source citations
+        - WebCrew (web_analyst agent with TrustedWebSearch): web search on
+          trusted domains + content extraction + analysis
         - Input: User's validated aeronautic question
-        - Processing: Web search + content extraction + analysis
-        - Output: Structured summary of web search findings
         
         State Updates
         -------------
-        Updates self.state.web_result with the raw output from the web crew execution.
-        
-        Search Strategy
-        ---------------
-        - Uses SerperDevTool for reliable web search results
-        - Analyzes and summarizes relevant web content
-        - Filters results for aeronautic relevance and quality
-        - Provides structured insights from multiple web sources
-        
-        Content Enhancement
-        -------------------
-        - Complements local knowledge with current information
-        - Provides multiple perspectives on aeronautic topics
-        - Includes recent developments and industry updates
-        - Validates and cross-references local knowledge base findings
+        Updates self.state.rag_result and self.state.web_result with the raw
+        outputs of the two crews, and self.state.rag_context with the context
+        retrieved by the RAG tool (read from memory, not from disk).
         
         Notes
         -----
-        Web analysis results are combined with RAG analysis in the aggregation
-        stage to provide comprehensive, multi-source answers with both local
-        expertise and current external information.
+        RAG and web results are combined in the aggregation stage to provide
+        comprehensive, multi-source answers with both local expertise and
+        current external information.
         """
-        web_crew = WebCrew().crew()
-        result = (
-            web_crew.kickoff(inputs={"question": self.state.question_input,
-                             })
+        from rag_flow.tools.rag_w_qdrant.main import get_last_context
+
+        def run_rag(crew, inputs):
+            # il contesto è per-thread: va letto nel thread che ha eseguito la crew
+            return crew.kickoff(inputs=inputs), get_last_context()
+
+        inputs = {"question": self.state.question_input}
+        (rag_res, rag_context), web_res = await asyncio.gather(
+            asyncio.to_thread(run_rag, self._crew(_aero_crew), inputs),
+            self._crew(_web_crew).kickoff_async(inputs=inputs),
         )
-        self.state.web_result = result.raw
-        payload['web_result'] = result.raw
-        payload['web_crew'] = web_crew
-        return payload
+        self.state.rag_context = rag_context
+        self.state.rag_result = rag_res.raw
+        self.state.web_result = web_res.raw
     
-    @listen(web_analysis)
-    def aggregate_results(self, payload:Dict[str, Any]):
+    @listen(retrieve)
+    def aggregate_results(self):
         """
         Aggregate and synthesize results from RAG and web analysis.
         
@@ -431,20 +532,15 @@ class AeronauticRagFlow(Flow[AeronauticRagState]):
         """
         aggregated = f"RAG Result: {self.state.rag_result}\n\nWeb Result: {self.state.web_result}"
         self.state.all_results = aggregated
-        doc_crew = DocCrew().crew()
         result = (
-            doc_crew
+            self._crew(_doc_crew)
             .kickoff(inputs={"paper": aggregated,
                              })
         )
         self.state.document = result.raw
-        payload['doc_context'] = aggregated
-        payload['doc_result'] = result.raw
-        payload['doc_crew'] = doc_crew
-        return payload
     
     @listen(aggregate_results)
-    def bias_check(self, payload:Dict[str, Any]):
+    def bias_check(self):
         """
         Execute bias checking on the generated document.
         
@@ -461,7 +557,18 @@ class AeronauticRagFlow(Flow[AeronauticRagState]):
         
         State Updates
         -------------
-        Updates self.state.all_results with the bias-checked document output.
+        Updates self.state.final_doc with the bias-checked document output,
+        which is also stored in the semantic response cache.
+        
+        Fast Path
+        ---------
+        Disabled by default: the crew reviews every document. With
+        ``BIAS_SCREEN_ENABLED=1`` the document is first screened with a
+        regular expression for references to social groups, cultures and
+        stereotypes; if none is found the crew is skipped, the document is
+        used unchanged and the skip is logged. The word list cannot catch
+        every kind of bias, so enable it only where that trade-off is
+        acceptable.
         
         Bias Checking Features
         ----------------------
@@ -483,20 +590,22 @@ class AeronauticRagFlow(Flow[AeronauticRagState]):
         that all content is free from biases, promoting accuracy and ethical
         standards in aeronautic documentation.
         """
-        bias_crew = BiasCrew().crew()
-        result = (
-            bias_crew
-            .kickoff(inputs={"document": self.state.document,
-                             })
-        )
-        self.state.final_doc = result.raw
-        payload['bias_context'] = self.state.document
-        payload['bias_result'] = result.raw
-        payload['bias_crew'] = bias_crew
-        return payload
+        if (os.getenv("BIAS_SCREEN_ENABLED", "0") == "1"
+                and _BIAS_SCREEN_RE.search(self.state.document) is None):
+            print(f"Bias check skipped (BIAS_SCREEN_ENABLED=1, no screened terms) "
+                  f"for question: {self.state.question_input!r}")
+            self.state.final_doc = self.state.document
+        else:
+            result = (
+                self._crew(_bias_crew)
+                .kickoff(inputs={"document": self.state.document,
+                                 })
+            )
+            self.state.final_doc = result.raw
+        _response_cache().add(self.state.question_input, self.state.final_doc)
     
-    @listen(bias_check)
-    def plot_generation(self, payload:Dict[str, Any]):
+    @listen(or_(bias_check, "cache-hit"))
+    def plot_generation(self):
         """
         Generate and display flow execution visualization.
         
@@ -524,10 +633,13 @@ class AeronauticRagFlow(Flow[AeronauticRagState]):
         -----
         This final stage provides visual feedback on the complete flow execution,
         enabling users to understand the processing pipeline and verify correct
-        routing and stage execution.
+        routing and stage execution. Flows running concurrently
+        (``isolated_crews``) skip it, so they do not all rewrite the same
+        crewai_flow.html; ``kickoff_stream`` plots the diagram once at the end.
         """
+        if self.isolated_crews:
+            return
         self.plot()
-        return payload
 
 
 
@@ -553,10 +665,56 @@ def kickoff():
     This function is the main entry point for interactive execution
     of the aeronautic question-answering system.
     """
+    _setup_tracing()
     aeronautic_rag_flow = AeronauticRagFlow()
     aeronautic_rag_flow.kickoff()
 
 
+def kickoff_batch(questions):
+    """
+    Run the Aeronautic RAG Flow non-interactively on a list of questions.
+    
+    All questions are embedded with a single batched request up front, so
+    the retrieval step of each run reuses the cached query vector instead
+    of issuing its own embedding call; the flows then run one after the
+    other, sharing the cached crews and RAG resources.
+    
+    Parameters
+    ----------
+    questions : List[str]
+        Aeronautic questions to answer
+        
+    Returns
+    -------
+    List[str]
+        Final bias-checked document for each question, in input order
+        (empty string for questions rejected by validation)
+        
+    Notes
+    -----
+    The batch embedding is reused only when the RAG agent searches for the
+    question verbatim; rephrased tool inputs fall back to a regular call.
+    All flows run on a single event loop, since pooled async connections
+    cannot be reused across separate ``asyncio.run`` calls.
+    """
+    from rag_flow.tools.rag_w_qdrant.main import prefetch_query_embeddings
+
+    _setup_tracing()
+    prefetch_query_embeddings(questions)
+
+    async def run_all():
+        # un solo event loop per tutto il batch: il client async condiviso
+        # del validatore riusa le sue connessioni tra un flow e l'altro
+        results = []
+        for question in questions:
+            flow = AeronauticRagFlow()
+            await flow.kickoff_async(inputs={"question_input": question, "interactive": False})
+            results.append(flow.state.final_doc)
+        return results
+
+    return asyncio.run(run_all())
+
+
 def plot():
     """
     Generate and display the flow architecture visualization.
@@ -589,5 +747,59 @@ def plot():
     aeronautic_rag_flow.plot()
 
 
+def kickoff_stream(source=None, max_concurrency=4):
+    """
+    Answer questions read one per line from a file or from standard input.
+    
+    Each non-empty line is answered by an independent, non-interactive
+    AeronauticRagFlow; up to ``max_concurrency`` flows run at the same time
+    on one event loop, each with private copies of the shared crews.
+    
+    Parameters
+    ----------
+    source : str or file-like, optional
+        Path of a text file, or an open text stream; defaults to ``sys.stdin``
+    max_concurrency : int, optional
+        Maximum number of flows running concurrently (default: 4)
+        
+    Returns
+    -------
+    List[str]
+        Final document for each question, in input order (empty string for
+        questions rejected by validation)
+    """
+    if source is None:
+        source = sys.stdin
+    if isinstance(source, str):
+        with open(source, "r", encoding="utf-8") as f:
+            questions = [line.strip() for line in f if line.strip()]
+    else:
+        questions = [line.strip() for line in source if line.strip()]
+
+    _setup_tracing()
+
+    async def run_all():
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def run_one(question):
+            async with semaphore:
+                flow = AeronauticRagFlow()
+                flow.isolated_crews = True
+                await flow.kickoff_async(inputs={"question_input": question, "interactive": False})
+                return flow.state.final_doc
+
+        return await asyncio.gather(*(run_one(q) for q in questions))
+
+    results = asyncio.run(run_all())
+    # diagramma generato una volta sola, dopo che tutti i flow sono terminati
+    plot()
+    for question, doc in zip(questions, results):
+        print(f"\n=== {question} ===\n{doc}")
+    return results
+
+
 if __name__ == "__main__":
-    kickoff()
+    if sys.stdin.isatty():
+        kickoff()
+    else:
+        kickoff_stream()
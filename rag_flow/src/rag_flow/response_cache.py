@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+from typing import Any, Callable, List, Optional
+
+import numpy as np
+
+
+class SemanticResponseCache:
+    """
+    Persistent cache of flow results keyed by question similarity.
+
+    Answering a question runs four crews; near-duplicate questions (repeated
+    user queries, evaluation sweeps) can instead reuse the result produced
+    for an earlier question (the final document, or any JSON-serializable
+    value such as a dict of state fields). Lookups first try an exact match on the
+    normalized question text, then a cosine-similarity search over the
+    embeddings of the cached questions.
+
+    Attributes
+    ----------
+    path : str
+        JSON Lines file where entries are appended
+    threshold : float
+        Minimum cosine similarity for a semantic hit
+    embed : Callable[[str], List[float]]
+        Function returning the embedding of a question
+    max_entries : int
+        Maximum number of entries kept; the oldest are dropped first
+    version : Callable[[], str] or None
+        Function returning the current corpus fingerprint
+
+    Notes
+    -----
+    - Entries are loaded lazily on the first lookup and appended to the file
+      as they are added, so the cache survives across runs
+    - Embeddings are stored L2-normalized and stacked into one matrix on
+      demand, so similarity is a single matrix-vector product
+    - Each entry records the corpus fingerprint it was produced with; when
+      the fingerprint changes, older entries are discarded and the file is
+      rewritten without them
+    - When the cache grows past ``max_entries`` by a quarter, the oldest
+      entries are dropped and the file is compacted
+    - All methods are thread-safe
+    """
+
+    def __init__(self, embed: Callable[[str], List[float]],
+                 path: str = "output/response_cache.jsonl", threshold: float = 0.97,
+                 max_entries: int = 1000, version: Optional[Callable[[], str]] = None):
+        """
+        Create the cache.
+
+        Parameters
+        ----------
+        embed : Callable[[str], List[float]]
+            Function returning the embedding of a question
+        path : str, optional
+            JSON Lines file backing the cache (default: "output/response_cache.jsonl")
+        threshold : float, optional
+            Minimum cosine similarity for a semantic hit (default: 0.97)
+        max_entries : int, optional
+            Maximum number of entries kept (default: 1000)
+        version : Callable[[], str], optional
+            Function returning the current corpus fingerprint, checked on
+            every lookup and insertion; entries produced under a different
+            fingerprint are never served
+        """
+        self.path = path
+        self.threshold = threshold
+        self.embed = embed
+        self.max_entries = max_entries
+        self.version = version
+        self._lock = threading.Lock()
+        self._loaded_version: Optional[str] = None
+        self._reset()
+
+    def _reset(self) -> None:
+        self._exact: dict = {}
+        self._keys: List[str] = []
+        self._answers: List[Any] = []
+        self._rows: List[np.ndarray] = []
+        self._matrix: Optional[np.ndarray] = None
+
+    @staticmethod
+    def _key(question: str) -> str:
+        return " ".join(question.split()).lower()
+
+    @staticmethod
+    def _normalize(vector) -> np.ndarray:
+        v = np.asarray(vector, dtype=np.float32)
+        n = np.linalg.norm(v)
+        return v / n if n else v
+
+    def _current_version(self) -> str:
+        return self.version() if self.version is not None else ""
+
+    def _append(self, key: str, vector: np.ndarray, answer: Any) -> None:
+        self._exact[key] = answer
+        self._keys.append(key)
+        self._answers.append(answer)
+        self._rows.append(vector)
+        self._matrix = None
+
+    def _line(self, index: int, version: str) -> str:
+        return json.dumps({"question": self._keys[index], "embedding": self._rows[index].tolist(),
+                           "answer": self._answers[index], "version": version},
+                          ensure_ascii=False) + "\n"
+
+    def _rewrite(self, version: str) -> None:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.writelines(self._line(i, version) for i in range(len(self._keys)))
+        os.replace(tmp, self.path)
+
+    def _trim(self) -> bool:
+        drop = len(self._keys) - self.max_entries
+        if drop <= 0:
+            return False
+        keys, answers, rows = self._keys[drop:], self._answers[drop:], self._rows[drop:]
+        self._reset()
+        for key, vector, answer in zip(keys, rows, answers):
+            self._append(key, vector, answer)
+        return True
+
+    def _ensure_loaded(self, version: str) -> None:
+        if self._loaded_version == version:
+            return
+        self._loaded_version = version
+        self._reset()
+        if not os.path.exists(self.path):
+            return
+        stale = False
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                    if entry.get("version", "") != version:
+                        stale = True
+                        continue
+                    self._append(entry["question"], self._normalize(entry["embedding"]), entry["answer"])
+                except (ValueError, KeyError):
+                    continue
+        if self._trim() or stale:
+            self._rewrite(version)
+
+    def _similarities(self, q: np.ndarray) -> np.ndarray:
+        if self._matrix is None:
+            self._matrix = np.vstack(self._rows)
+        return self._matrix @ q
+
+    def lookup(self, question: str) -> Optional[Any]:
+        """
+        Return the cached result for the question or a near-duplicate.
+
+        Parameters
+        ----------
+        question : str
+            User question
+
+        Returns
+        -------
+        Optional[Any]
+            Cached result, or None on a miss
+        """
+        key = self._key(question)
+        version = self._current_version()
+        with self._lock:
+            self._ensure_loaded(version)
+            if key in self._exact:
+                return self._exact[key]
+            if not self._rows:
+                return None
+        q = self._normalize(self.embed(question))
+        with self._lock:
+            if not self._rows:
+                return None
+            sims = self._similarities(q)
+            best = int(np.argmax(sims))
+            if sims[best] >= self.threshold:
+                return self._answers[best]
+        return None
+
+    def add(self, question: str, answer: Any) -> None:
+        """
+        Store the result produced for a question.
+
+        Parameters
+        ----------
+        question : str
+            User question
+        answer : Any
+            JSON-serializable result generated by the flow (empty values are not stored)
+        """
+        if not answer:
+            return
+        key = self._key(question)
+        vector = self._normalize(self.embed(question))
+        version = self._current_version()
+        with self._lock:
+            self._ensure_loaded(version)
+            if key in self._exact:
+                return
+            self._append(key, vector, answer)
+            # amortized compaction: rewrite the file only once 25% over the bound
+            if len(self._keys) > self.max_entries + self.max_entries // 4:
+                self._trim()
+                self._rewrite(version)
+                return
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(self._line(len(self._keys) - 1, version))
@@ -1,76 +1,47 @@
 #!/usr/bin/env python
 import streamlit as st
-from pydantic import BaseModel
-from crewai.flow import Flow, listen, start, router
-from rag_flow.crews.bias_crew.bias_crew import BiasCrew
-from rag_flow.crews.rag_crew.rag_crew import AeronauticRagCrew
-from rag_flow.crews.web_crew.web_crew import WebCrew
-from rag_flow.crews.doc_crew.doc_crew import DocCrew
+from pydantic import BaseModel, ConfigDict
+from crewai.flow import Flow, listen, start, router, or_
 import os
-import pandas as pd
+import asyncio
+import io
 import time
 from dotenv import load_dotenv
-from langchain_openai import AzureChatOpenAI
-from typing import Dict, Any
-from opik import configure 
-from opik.integrations.crewai import track_crewai 
 import json
+import hashlib
+import sqlite3
+from contextlib import closing
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict
+from itertools import islice
+from pathlib import Path
 
 
-# Carica le variabili d'ambiente
-load_dotenv()
+# Streamlit riesegue lo script a ogni interazione: la configurazione globale
+# (.env, variabili d'ambiente, hook Opik) va eseguita una sola volta per processo
+@st.cache_resource(show_spinner=False)
+def _bootstrap():
+    """Inizializzazione una tantum di ambiente e tracing"""
+    from opik import configure
+    from opik.integrations.crewai import track_crewai
 
-def create_download_link(data, filename, label):
-    """Crea un link di download personalizzato"""
-    import base64
-    
-    if isinstance(data, str):
-        data_bytes = data.encode('utf-8')
-    else:
-        data_bytes = data
-        
-    b64 = base64.b64encode(data_bytes).decode()
-    
-    return f"""
-    <a href="data:application/octet-stream;base64,{b64}" 
-       download="{filename}" 
-       style="text-decoration: none;">
-        <button style="
-            background-color: #0066cc;
-            color: white;
-            border: none;
-            padding: 0.5rem 1rem;
-            border-radius: 0.5rem;
-            cursor: pointer;
-            width: 100%;
-            font-size: 14px;
-            font-weight: 500;
-        " onmouseover="this.style.backgroundColor='#0052a3'" 
-           onmouseout="this.style.backgroundColor='#0066cc'">
-            {label}
-        </button>
-    </a>
-    """
+    # Carica le variabili d'ambiente
+    load_dotenv()
 
-# Configurazioni iniziali
-configure(use_local=True)
-os.environ["CURL_CA_BUNDLE"] = ""
-os.environ["REQUESTS_CA_BUNDLE"] = ""
-os.environ["SSL_VERIFY"] = "false"
-os.environ["PYTHONHTTPSVERIFY"] = "0"
-os.environ["OTEL_SDK_DISABLED"] = "true"
+    # Configurazioni iniziali
+    configure(use_local=True)
+    # La verifica TLS resta attiva: dietro un proxy aziendale impostare
+    # REQUESTS_CA_BUNDLE / SSL_CERT_FILE sul certificato della CA interna
+    os.environ["OTEL_SDK_DISABLED"] = "true"
 
-track_crewai(project_name="final-project")
+    track_crewai(project_name="final-project")
+    return True
 
-# Configurazione pagina Streamlit
-st.set_page_config(
-    page_title="Aeronautic RAG System",
-    layout="wide",
-    initial_sidebar_state="expanded"
-)
 
-# Custom CSS
-st.markdown("""
+_bootstrap()
+
+CUSTOM_CSS = """
 <style>
     .stProgress .st-bo {
         background-color: #0d47a1;
@@ -109,7 +80,20 @@ st.markdown("""
         box-shadow: 0 0 0 0.2rem rgba(0, 102, 204, 0.25) !important;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+
+# Configurazione pagina Streamlit
+st.set_page_config(
+    page_title="Aeronautic RAG System",
+    layout="wide",
+    initial_sidebar_state="expanded"
+)
+
+# Custom CSS (costante di modulo; va comunque inviata a ogni rerun, perché
+# Streamlit ricostruisce la pagina da zero). st.html inserisce lo <style>
+# direttamente nella pagina senza passare dal parser Markdown e, contenendo
+# solo CSS, non occupa spazio nel layout
+st.html(CUSTOM_CSS)
 
 #load_dotenv()  # Carica le variabili d'ambiente dal file .env 
 endpoint = os.getenv("AZURE_API_BASE")
@@ -117,6 +101,327 @@ key = os.getenv("AZURE_API_KEY")
 deployment_name = os.getenv("MODEL")  # nome deployment modello completions
 api_version=os.getenv("AZURE_API_VERSION", "2024-06-01")
 
+@st.cache_resource(show_spinner=False)
+def get_validator_llm():
+    """Client Azure OpenAI del validatore, creato una volta per processo server"""
+    from langchain_openai import AzureChatOpenAI
+
+    return AzureChatOpenAI(
+        azure_deployment="gpt-4o",  # or your deployment
+        api_version=api_version,  # or your api version
+        temperature=0,
+        max_retries=2,
+        max_tokens=120,  # verdetto JSON con breve motivazione, margine per spazi e a capo
+        model_kwargs={"response_format": {"type": "json_object"}},
+    )
+
+
+# Un'unica chiamata valuta pertinenza aeronautica ed etica della domanda
+VALIDATION_SYSTEM_PROMPT = """You are an expert in aeronautics and an ethical AI expert specialized in content moderation.
+Your role is to evaluate user questions against two independent criteria.
+AERONAUTIC: the question is relevant to aeronautics.
+ETHICAL: the question is appropriate and ethical.
+Consider a question ETHICAL if it:
+- Seeks legitimate information
+- Has educational or professional purpose
+- Does not promote harm, violence, or illegal activities
+- Does not involve personal attacks or hate speech
+Consider a question UNETHICAL if it:
+- Requests harmful, dangerous, or illegal information
+- Contains hate speech, discrimination, or personal attacks
+- Aims to manipulate, deceive, or cause harm
+- Violates privacy or confidentiality
+Be permissive with legitimate academic, technical, or professional questions.
+Answer only with a JSON object of the form
+{"aeronautic": true|false, "ethical": true|false, "reason": "<one short sentence>"}."""
+
+
+VALIDATION_CACHE_SIZE = 1024
+
+# Frasi di riferimento per il pre-filtro locale di pertinenza aeronautica
+AERO_SEED_TEXTS = (
+    "How does a jet engine produce thrust?",
+    "Principles of aerodynamics: lift, drag and airfoil design",
+    "How is a helicopter rotor controlled?",
+    "Drone and UAV flight control systems",
+    "Aircraft maintenance and airworthiness regulations",
+    "Turbofan and turboprop engine components",
+    "Flight instruments and avionics in the cockpit",
+    "Wing structures and composite materials in aircraft",
+    "Air traffic control and aviation safety procedures",
+    "Stability and control of fixed-wing aircraft",
+    "Come funziona un motore a reazione?",
+    "Che cos'è la portanza di un'ala?",
+    "Come si pilota un elicottero?",
+    "Normativa EASA sulla manutenzione degli aeromobili",
+    "Prestazioni di decollo e atterraggio di un aereo",
+    "Sistemi di propulsione per razzi e veicoli spaziali",
+)
+# Domande etichettate come NON aeronautiche, scelte vicine al dominio (motori,
+# trasporti, fisica): servono a calibrare la soglia di accettazione del pre-filtro
+AERO_CALIBRATION_OFF_TOPIC = (
+    "How does a car engine work?",
+    "How do I change the oil in my motorcycle?",
+    "How does a sailboat move against the wind?",
+    "How do birds migrate across continents?",
+    "What is the best recipe for lasagna?",
+    "Who won the last football world cup?",
+    "How do wind turbines generate electricity?",
+    "Come funziona il motore di un treno ad alta velocità?",
+    "Quali sono le regole del codice della strada?",
+    "Come si calcola l'interesse composto di un mutuo?",
+)
+# Margine sopra la similarità massima osservata sulle domande non pertinenti
+AERO_CALIBRATION_MARGIN = 0.02
+
+
+@st.cache_resource(show_spinner=False)
+def get_aero_filter():
+    """
+    Embedding normalizzati delle frasi di riferimento e soglia di accettazione,
+    calcolati una volta per processo.
+
+    La soglia è calibrata sulle domande etichettate: è la similarità massima
+    di una domanda non pertinente più AERO_CALIBRATION_MARGIN, così nessuna
+    domanda del set di calibrazione viene accettata per errore.
+    """
+    import numpy as np
+    from rag_flow.tools.rag_w_qdrant.main import embed_documents
+
+    m = np.asarray(embed_documents(AERO_SEED_TEXTS + AERO_CALIBRATION_OFF_TOPIC), dtype=np.float32)
+    m /= np.linalg.norm(m, axis=1, keepdims=True)
+    seeds, off_topic = m[:len(AERO_SEED_TEXTS)], m[len(AERO_SEED_TEXTS):]
+    threshold = float(np.max(off_topic @ seeds.T)) + AERO_CALIBRATION_MARGIN
+    return seeds, threshold
+
+
+def local_aero_verdict(question: str):
+    """
+    Pre-filtro locale: True se la domanda è chiaramente aeronautica, None se decide l'LLM.
+
+    Non rifiuta mai: una similarità bassa non basta a escludere una domanda
+    pertinente formulata in modo insolito, quindi il giudizio resta all'LLM.
+    """
+    import numpy as np
+    from rag_flow.tools.rag_w_qdrant.main import embed_query
+
+    try:
+        # embed_query è in cache: lo stesso vettore serve alla cache semantica e al retrieval
+        q = np.asarray(embed_query(question), dtype=np.float32)
+        seeds, threshold = get_aero_filter()
+        best = float(np.max(seeds @ (q / np.linalg.norm(q))))
+    except Exception:
+        return None
+    return True if best >= threshold else None
+
+
+def _parse_verdict(content):
+    """Verdetto JSON del validatore come dict, None se non è un oggetto JSON valido"""
+    try:
+        verdict = json.loads(content)
+    except (TypeError, ValueError):
+        return None
+    return verdict if isinstance(verdict, dict) else None
+
+
+@st.cache_resource(show_spinner=False)
+def get_validation_cache():
+    """LRU dei verdetti (aeronautic_ok, ethical_ok, reason) per domanda, condivisa tra le sessioni, con il suo lock"""
+    # Il lock sta nella stessa risorsa: una variabile di modulo verrebbe
+    # ricreata a ogni rerun dello script
+    return OrderedDict(), threading.Lock()
+
+
+# Le crew sono costruite una volta sola; ogni esecuzione usa una copia
+# (crew.copy()), perché kickoff modifica i task e più sessioni Streamlit
+# possono girare in parallelo
+@st.cache_resource(show_spinner=False)
+def get_rag_crew():
+    """Crew RAG condivisa tra le sessioni"""
+    from rag_flow.crews.rag_crew.rag_crew import AeronauticRagCrew
+
+    return AeronauticRagCrew().crew()
+
+
+@st.cache_resource(show_spinner=False)
+def get_web_crew():
+    """Crew di ricerca web condivisa tra le sessioni"""
+    from rag_flow.crews.web_crew.web_crew import WebCrew
+
+    return WebCrew().crew()
+
+
+@st.cache_resource(show_spinner=False)
+def get_doc_crew():
+    """Crew di generazione documento condivisa tra le sessioni"""
+    from rag_flow.crews.doc_crew.doc_crew import DocCrew
+
+    return DocCrew().crew()
+
+
+@st.cache_resource(show_spinner=False)
+def get_bias_crew():
+    """Crew di bias check condivisa tra le sessioni"""
+    from rag_flow.crews.bias_crew.bias_crew import BiasCrew
+
+    return BiasCrew().crew()
+
+
+METRICS_PATH = "output/rag_eval_results.json"
+
+
+# Le letture dei file di output sono memorizzate da st.cache_data: la chiave
+# include l'mtime, quindi un file riscritto da una nuova esecuzione viene riletto
+@st.cache_data(show_spinner=False)
+def load_metrics(path: str, mtime: float):
+    """Legge le metriche RAGAS: ritorna (dict o DataFrame, testo grezzo)"""
+    with open(path, "r", encoding="utf-8") as f:
+        raw = f.read()
+    try:
+        # Prova formato JSON standard
+        return json.loads(raw), raw
+    except json.JSONDecodeError:
+        import pandas as pd
+
+        return pd.read_json(io.StringIO(raw), lines=True), raw
+
+
+# Cache esatta (per hash del contenuto) degli output di DocCrew e BiasCrew:
+# a parità di input, prompt e modello l'output non cambia
+CREW_OUTPUT_CACHE_DIR = "output/crew_cache"
+CREW_OUTPUT_CACHE_MAX = 200  # file tenuti per crew, i meno usati vengono rimossi
+CREW_CONFIG_DIRS = {
+    "doc": Path(__file__).parent / "crews" / "doc_crew" / "config",
+    "bias": Path(__file__).parent / "crews" / "bias_crew" / "config",
+}
+
+
+def _content_key(kind: str, text: str) -> str:
+    """Hash dell'input di una crew, della sua configurazione (agents/tasks.yaml, llm) e del deployment"""
+    h = hashlib.blake2b(digest_size=16)
+    for name in ("agents.yaml", "tasks.yaml"):
+        h.update((CREW_CONFIG_DIRS[kind] / name).read_bytes())
+    h.update(f"\0{deployment_name}\0".encode("utf-8"))
+    h.update(text.encode("utf-8"))
+    return h.hexdigest()
+
+
+def load_crew_output(kind: str, key: str):
+    """Output salvato per (crew, hash dell'input), o None"""
+    path = os.path.join(CREW_OUTPUT_CACHE_DIR, kind, f"{key}.md")
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            text = f.read()
+        os.utime(path)  # mtime = ultimo uso, per l'eviction
+        return text
+    except OSError:
+        return None
+
+
+def store_crew_output(kind: str, key: str, text: str) -> None:
+    """Salva l'output di una crew sotto l'hash del suo input"""
+    if not text:
+        return
+    folder = os.path.join(CREW_OUTPUT_CACHE_DIR, kind)
+    os.makedirs(folder, exist_ok=True)
+    with open(os.path.join(folder, f"{key}.md"), "w", encoding="utf-8") as f:
+        f.write(text)
+    entries = list(os.scandir(folder))
+    if len(entries) > CREW_OUTPUT_CACHE_MAX:
+        entries.sort(key=lambda e: e.stat().st_mtime)
+        for entry in entries[:len(entries) - CREW_OUTPUT_CACHE_MAX]:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+
+
+FLOW_HTML = "crewai_flow.html"
+
+
+@st.cache_data(show_spinner=False)
+def load_flow_html(path: str, mtime: float) -> str:
+    """Legge il diagramma HTML del Flow (riletto solo se il file cambia)"""
+    return Path(path).read_text(encoding="utf-8")
+
+
+def generate_flow_html() -> None:
+    """Rigenera il diagramma del Flow se manca o è più vecchio di questo modulo (gira nel pool)"""
+    # Il diagramma dipende solo dal codice del Flow
+    if not (os.path.exists(FLOW_HTML)
+            and os.path.getmtime(FLOW_HTML) >= os.path.getmtime(__file__)):
+        AeronauticRagFlow().plot()
+
+
+HISTORY_DB = "output/history.sqlite"
+HISTORY_PAGE_SIZE = 20  # voci dello storico mostrate per pagina
+
+
+# Lo storico completo sta su SQLite; in session_state restano solo id,
+# timestamp e domanda, così la sessione non accumula i documenti generati
+@st.cache_resource(show_spinner=False)
+def get_history_db() -> str:
+    """Crea (una volta per processo) la tabella dello storico e ritorna il path del DB"""
+    os.makedirs(os.path.dirname(HISTORY_DB), exist_ok=True)
+    with closing(sqlite3.connect(HISTORY_DB)) as conn, conn:
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS history ("
+            "id INTEGER PRIMARY KEY, ts TEXT, question TEXT, rag_result TEXT, "
+            "web_result TEXT, document TEXT, final_document TEXT)"
+        )
+    return HISTORY_DB
+
+
+def save_history(question: str, state) -> dict:
+    """Salva un'esecuzione nello storico; ritorna la voce leggera per session_state"""
+    ts = time.strftime("%Y-%m-%d %H:%M:%S")
+    with closing(sqlite3.connect(get_history_db())) as conn, conn:
+        cur = conn.execute(
+            "INSERT INTO history (ts, question, rag_result, web_result, document, final_document) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (ts, question, state.rag_result, state.web_result, state.document, state.final_doc),
+        )
+    return {'id': cur.lastrowid, 'ts': ts, 'question': question}
+
+
+# Le righe dello storico non cambiano dopo l'inserimento: cache per id
+@st.cache_data(show_spinner=False, max_entries=256)
+def load_history_row(row_id: int) -> dict:
+    """Legge su richiesta i risultati completi di un'esecuzione"""
+    with closing(sqlite3.connect(get_history_db())) as conn:
+        conn.row_factory = sqlite3.Row
+        row = conn.execute("SELECT * FROM history WHERE id = ?", (row_id,)).fetchone()
+    return dict(row) if row else {}
+
+
+# Campi dello state salvati nella cache semantica e ripristinati in caso di hit
+CACHED_STATE_FIELDS = ("rag_result", "web_result", "all_results", "document", "final_doc", "rag_context")
+
+
+@st.cache_resource(show_spinner=False)
+def get_semantic_cache():
+    """Cache semantica delle risposte, caricata una volta per processo server"""
+    from rag_flow.response_cache import SemanticResponseCache
+    from rag_flow.tools.rag_w_qdrant.main import corpus_fingerprint, embed_query
+
+    return SemanticResponseCache(embed_query, path="output/semantic_cache.jsonl", version=corpus_fingerprint)
+
+
+@st.cache_resource(show_spinner=False)
+def get_executor():
+    """Pool di thread su cui girano i Flow, così lo script Streamlit resta reattivo"""
+    return ThreadPoolExecutor(max_workers=4, thread_name_prefix="rag-flow")
+
+
+# Streamlit gestisce il rerun del click su Cancel solo quando lo script invia un
+# delta: negli stage senza avanzamenti lo status viene reinviato a questo intervallo
+UI_HEARTBEAT_S = 1.0
+
+
+class FlowCancelled(Exception):
+    """Sollevata al confine tra due step quando l'utente annulla la pipeline"""
+
+
 class AeronauticRagState(BaseModel):
     """
     State model for Aeronautic RAG Flow execution.
@@ -140,7 +445,13 @@ class AeronauticRagState(BaseModel):
     -----
     State persistence enables tracking of data flow between different crew executions
     and allows for comprehensive result aggregation and document generation.
+    The steps communicate only through the state (no payload dicts are passed
+    between listeners). Assignments are not re-validated: apart from
+    question_input, set once from the UI, all writes are strings produced by
+    the flow itself.
     """
+    model_config = ConfigDict(validate_assignment=False)
+
     question_input: str = ""
     rag_result: str = ""
     web_result: str = ""
@@ -165,18 +476,73 @@ class AeronauticRagFlow(Flow[AeronauticRagState]):
         # Streamlit UI components per aggiornamenti real-time
         self.status_placeholder = None
         self.progress_placeholder = None
+        # Il Flow gira in un thread in background: update_ui scrive solo qui,
+        # i placeholder vengono aggiornati dal thread dello script (render_ui)
+        self._ui_lock = threading.Lock()
+        self._ui_state = {"message": None, "progress": 0.0}
+        self.cancel_event = threading.Event()
+        # Output parziale degli agenti (step_callback), per stage
+        self.stream_placeholder = None
+        self._stream = {}
+        self._stream_version = 0
+        self._rendered_version = 0
+        # Ultimo (messaggio, progresso) inviato ai placeholder e istante dell'invio
+        self._rendered_ui = None
+        self._rendered_at = 0.0
+        # True se i risultati arrivano dalla cache semantica
+        self.cache_hit = False
         
-    def set_ui_components(self, status_placeholder, progress_placeholder):
+    def set_ui_components(self, status_placeholder, progress_placeholder, stream_placeholder=None):
         """Imposta i componenti UI per aggiornamenti real-time"""
         self.status_placeholder = status_placeholder
         self.progress_placeholder = progress_placeholder
+        self.stream_placeholder = stream_placeholder
+        self._rendered_ui = None
+
+    def _streaming(self, crew, stage: str):
+        """Collega lo step_callback della crew al buffer di streaming dello stage"""
+        def on_step(step):
+            text = getattr(step, "output", None) or getattr(step, "text", None) or ""
+            if not text:
+                return
+            with self._ui_lock:
+                self._stream.setdefault(stage, []).append(str(text))
+                self._stream_version += 1
+
+        crew.step_callback = on_step
+        return crew
     
     def update_ui(self, message: str, progress: float):
-        """Aggiorna l'interfaccia Streamlit"""
-        if self.status_placeholder:
-            self.status_placeholder.info(message)
-        if self.progress_placeholder:
-            self.progress_placeholder.progress(progress, text="Processing...")
+        """Registra l'avanzamento; interrompe il Flow se l'utente ha annullato"""
+        if self.cancel_event.is_set():
+            raise FlowCancelled("Pipeline cancelled by the user")
+        with self._ui_lock:
+            self._ui_state = {"message": message, "progress": progress}
+
+    def render_ui(self):
+        """Aggiorna i placeholder Streamlit con l'ultimo avanzamento (thread dello script)"""
+        with self._ui_lock:
+            message, progress = self._ui_state["message"], self._ui_state["progress"]
+        # Status e progresso reinviati al browser quando cambiano, o come heartbeat
+        # così un Cancel viene recepito anche negli stage silenziosi
+        now = time.monotonic()
+        if message is not None and (
+            (message, progress) != self._rendered_ui or now - self._rendered_at >= UI_HEARTBEAT_S
+        ):
+            self._rendered_ui = (message, progress)
+            self._rendered_at = now
+            if self.status_placeholder:
+                self.status_placeholder.info(message)
+            if self.progress_placeholder:
+                self.progress_placeholder.progress(progress, text="Processing...")
+        if self.stream_placeholder is None or self._stream_version == self._rendered_version:
+            return
+        with self._ui_lock:
+            self._rendered_version = self._stream_version
+            partial = "\n\n".join(
+                f"**{stage}**\n\n" + "\n\n".join(chunks) for stage, chunks in self._stream.items()
+            )
+        self.stream_placeholder.markdown(partial)
 
     @start('retry')
     def starting_procedure(self):
@@ -215,87 +581,72 @@ class AeronauticRagFlow(Flow[AeronauticRagState]):
         pass
 
     @router(generate_question)
-    def aeronautic_question_analysis(self):
+    async def validate_question(self):
         """
-        Validate question relevance to aeronautics using Azure OpenAI.
+        Validate aeronautic relevance and ethics of the question using Azure OpenAI.
+        
+        Both checks are answered by a single request returning a JSON verdict.
         """
-        self.update_ui(":material/search: Step 1/6: Validating aeronautic relevance...", 0.15)
+        self.update_ui(":material/search: Step 1/4: Validating aeronautic relevance and ethics...", 0.15)
         
-        try:
-            llm = AzureChatOpenAI(
-                azure_deployment="gpt-4o",  # or your deployment
-            api_version=api_version,  # or your api version
-            temperature=0,
-            max_retries=2,
-            ) 
-            messages=[
-                    {"role": "system", "content": "You are an expert in aeronautics."},
-                    {"role": "user", "content": f"Is the following question relevant to aeronautics? Question: {self.state.question_input}. Answer only with 'True' or 'False'"}
-                ]
-            
-            res = llm.invoke(messages)
-            res = res.content.strip().lower()
-
-            if 'true' in res:
-                return "success"
-            else:
-                # Imposta errore per il frontend
-                self.state.validation_error = "aeronautic"
-                self.state.error_message = "La domanda non è rilevante per l'aeronautica. Inserisci una domanda pertinente al settore aeronautico (aerei, elicotteri, droni, motori aeronautici, aerodinamica, etc.)."
+        # temperature=0: una domanda già validata (es. un retry) riusa il verdetto
+        cache, cache_lock = get_validation_cache()
+        cache_key = " ".join(self.state.question_input.split()).lower()
+        with cache_lock:
+            verdict = cache.get(cache_key)
+            if verdict is not None:
+                cache.move_to_end(cache_key)
+        if verdict is None:
+            verdict = await self._ask_validators()
+            if verdict is None:
                 return "validation_failed"
-        except Exception as e:
-            # Errore tecnico durante la validazione
-            self.state.validation_error = "technical"
-            self.state.error_message = f"Errore durante la validazione aeronautica: {str(e)}"
+            with cache_lock:
+                cache[cache_key] = verdict
+                cache.move_to_end(cache_key)
+                if len(cache) > VALIDATION_CACHE_SIZE:
+                    cache.popitem(last=False)
+        aero_ok, eth_ok, reason = verdict
+        detail = f"\n\nMotivo: {reason}" if reason else ""
+
+        if not aero_ok:
+            # Imposta errore per il frontend
+            self.state.validation_error = "aeronautic"
+            self.state.error_message = "La domanda non è rilevante per l'aeronautica. Inserisci una domanda pertinente al settore aeronautico (aerei, elicotteri, droni, motori aeronautici, aerodinamica, etc.)." + detail
+            return "validation_failed"
+        if not eth_ok:
+            self.state.validation_error = "ethical"
+            self.state.error_message = "La domanda presenta problematiche etiche. Inserisci una domanda appropriata che non contenga contenuti dannosi, discriminatori o inappropriati." + detail
             return "validation_failed"
+        return "success-ethical"
 
-    @router("success")
-    def ethic_question_analysis(self):
-        """
-        Validate question ethics using Azure OpenAI.
-        """
-        self.update_ui(":material/balance: Step 2/6: Ethics validation...", 0.25)
-        
+    async def _ask_validators(self):
+        """Interroga il validatore; ritorna (aeronautic_ok, ethical_ok, reason) o None su errore tecnico"""
+        aero_local = await asyncio.to_thread(local_aero_verdict, self.state.question_input)
+        messages = [
+            {"role": "system", "content": VALIDATION_SYSTEM_PROMPT},
+            {"role": "user", "content": f"Question: {self.state.question_input}"}
+        ]
         try:
-            llm = AzureChatOpenAI(
-                azure_deployment="gpt-4o",  # or your deployment
-            api_version=api_version,  # or your api version
-            temperature=0,
-            max_retries=2,
-            ) 
-            messages=[{"role": "system", "content":
-                    """You are an ethical AI expert specialized in content moderation. 
-                    Your role is to evaluate if questions are appropriate and ethical.
-                    Consider a question ETHICAL if it:
-                    - Seeks legitimate information
-                    - Has educational or professional purpose
-                    - Does not promote harm, violence, or illegal activities
-                    - Does not involve personal attacks or hate speech
-                    Consider a question UNETHICAL if it:
-                    - Requests harmful, dangerous, or illegal information
-                    - Contains hate speech, discrimination, or personal attacks
-                    - Aims to manipulate, deceive, or cause harm
-                    - Violates privacy or confidentiality
-                    Be permissive with legitimate academic, technical, or professional questions."""
-                    },
-                    {"role": "user", "content": f"Is the following question ethical or harmful? Question: {self.state.question_input}. Answer only with 'True' or 'False'"}
-                ]
-            
-            res = llm.invoke(messages)
-            res = res.content.strip().lower()
-
-            if 'true' in res:
-                return "success-ethical"
-            else:
-                # Imposta errore per il frontend
-                self.state.validation_error = "ethical"
-                self.state.error_message = "La domanda presenta problematiche etiche. Inserisci una domanda appropriata che non contenga contenuti dannosi, discriminatori o inappropriati."
-                return "validation_failed"
+            # Un verdetto non valido (JSON troncato o non oggetto) è un errore del
+            # validatore, non un rifiuto: si riprova una volta
+            verdict = None
+            for _ in range(2):
+                res = await get_validator_llm().ainvoke(messages)
+                verdict = _parse_verdict(res.content)
+                if verdict is not None:
+                    break
+            if verdict is None:
+                raise ValueError(f"verdetto non valido: {res.content!r}")
         except Exception as e:
-            # Errore tecnico durante la validazione etica
+            # Errore tecnico durante la validazione
             self.state.validation_error = "technical"
-            self.state.error_message = f"Errore durante la validazione etica: {str(e)}"
-            return "validation_failed"
+            self.state.error_message = f"Errore durante la validazione: {str(e)}"
+            return None
+
+        # La chiamata serve comunque per il verdetto etico: il pre-filtro locale
+        # evita solo i falsi rifiuti dell'LLM su domande chiaramente aeronautiche
+        aero_ok = aero_local is True or verdict.get("aeronautic") is True
+        return (aero_ok, verdict.get("ethical") is True, str(verdict.get("reason", "")))
 
     @listen("validation_failed")
     def handle_validation_error(self):
@@ -306,100 +657,99 @@ class AeronauticRagFlow(Flow[AeronauticRagState]):
         self.update_ui(":material/error: Validation failed", 0.0)
         return None
 
-    @listen("success-ethical")
-    def rag_analysis(self):
-        """
-        Execute RAG-based analysis using local aeronautic knowledge base.
+    @router("success-ethical")
+    async def check_semantic_cache(self):
         """
-        self.update_ui(":material/note_stack: Step 3/6: RAG analysis (local knowledge base)...", 0.45)
-        
-        aero_crew = AeronauticRagCrew().crew()
-        result = (
-            aero_crew.kickoff(inputs={"question": self.state.question_input,
-                             })
-        )
+        Reuse the results of a previously answered, near-identical question.
         
-        # Leggi il context se disponibile
-        try:
-            with open("output/last_context.txt", "r", encoding="utf-8") as f:
-                CONTEXT = f.read()
-        except FileNotFoundError:
-            CONTEXT = "Context file not available"
-        except Exception as e:
-            CONTEXT = f"Error reading context: {str(e)}"
-            
-        self.state.rag_result = result.raw
-        return {
-            "aero_crew": aero_crew,
-            "rag_context": CONTEXT,
-            "rag_result": result.raw,
-            "question": self.state.question_input
-        }
-    
-    @listen(rag_analysis)
-    def web_analysis(self, payload:Dict[str, Any]):
+        Runs after validation, so a cached answer is only served to a
+        question that passed the aeronautic and ethics checks itself.
         """
-        Execute web-based analysis to complement local knowledge base.
+        cached_state = await asyncio.to_thread(get_semantic_cache().lookup, self.state.question_input)
+        if cached_state is None:
+            return "cache-miss"
+        for field in CACHED_STATE_FIELDS:
+            setattr(self.state, field, cached_state.get(field, ""))
+        self.cache_hit = True
+        return "cache-hit"
+
+    @listen("cache-miss")
+    async def fanout_analysis(self):
         """
-        self.update_ui(":material/captive_portal: Step 4/6: Web analysis (external sources)...", 0.65)
+        Execute RAG-based and web-based analysis concurrently.
         
-        web_crew = WebCrew().crew()
-        result = (
-            web_crew.kickoff(inputs={"question": self.state.question_input,
-                             })
-        )
-        self.state.web_result = result.raw
-        payload['web_result'] = result.raw
-        payload['web_crew'] = web_crew
-        return payload
+        Both crews only need the validated question, so they are started
+        together with ``kickoff_async`` and awaited with ``asyncio.gather``.
+        """
+        self.update_ui(":material/note_stack: Step 2/4: RAG analysis and web analysis (in parallel)...", 0.45)
+        
+        from rag_flow.tools.rag_w_qdrant.main import get_last_context
+
+        def run_rag(crew, inputs):
+            # il contesto è per-thread: va letto nel thread che ha eseguito la crew
+            return crew.kickoff(inputs=inputs), get_last_context()
+
+        aero_crew = self._streaming(get_rag_crew().copy(), "RAG Analysis")
+        web_crew = self._streaming(get_web_crew().copy(), "Web Analysis")
+        inputs = {"question": self.state.question_input}
+        rag_task = asyncio.create_task(asyncio.to_thread(run_rag, aero_crew, inputs))
+        web_task = asyncio.create_task(web_crew.kickoff_async(inputs=inputs))
+        (rag_res, rag_context), web_res = await asyncio.gather(rag_task, web_task)
+            
+        self.state.rag_result = rag_res.raw
+        self.state.web_result = web_res.raw
+        self.state.rag_context = rag_context
     
-    @listen(web_analysis)
-    def aggregate_results(self, payload:Dict[str, Any]):
+    @listen(fanout_analysis)
+    def aggregate_results(self):
         """
         Aggregate and synthesize results from RAG and web analysis.
         """
-        self.update_ui(":material/contract_edit: Step 5/6: Generating comprehensive document...", 0.85)
+        self.update_ui(":material/contract_edit: Step 3/4: Generating comprehensive document...", 0.85)
         
         aggregated = f"RAG Result: {self.state.rag_result}\n\nWeb Result: {self.state.web_result}"
         self.state.all_results = aggregated
-        doc_crew = DocCrew().crew()
+        key = _content_key("doc", aggregated)
+        cached = load_crew_output("doc", key)
+        if cached is not None:
+            self.state.document = cached
+            return
+        doc_crew = self._streaming(get_doc_crew().copy(), "Document Generation")
         result = (
             doc_crew
             .kickoff(inputs={"paper": aggregated,
                              })
         )
         self.state.document = result.raw
-        payload['doc_context'] = aggregated
-        payload['doc_result'] = result.raw
-        payload['doc_crew'] = doc_crew
-        return payload
+        store_crew_output("doc", key, result.raw)
     
     @listen(aggregate_results)
-    def bias_check(self, payload:Dict[str, Any]):
+    def bias_check(self):
         """
         Execute bias checking on the generated document.
         """
-        self.update_ui(":material/fact_check: Step 6/6: Bias checking...", 0.95)
+        self.update_ui(":material/fact_check: Step 4/4: Bias checking...", 0.95)
         
-        bias_crew = BiasCrew().crew()
+        key = _content_key("bias", self.state.document)
+        cached = load_crew_output("bias", key)
+        if cached is not None:
+            self.state.final_doc = cached
+            return
+        bias_crew = self._streaming(get_bias_crew().copy(), "Bias Check")
         result = (
             bias_crew
             .kickoff(inputs={"document": self.state.document,
                              })
         )
         self.state.final_doc = result.raw
-        payload['bias_context'] = self.state.document
-        payload['bias_result'] = result.raw
-        payload['bias_crew'] = bias_crew
-        return payload
+        store_crew_output("bias", key, result.raw)
     
-    @listen(bias_check)
-    def plot_generation(self, payload:Dict[str, Any]):
+    @listen(or_(bias_check, "cache-hit"))
+    def plot_generation(self):
         """
         Generate and display flow execution visualization.
         """
         self.update_ui(":material/check_circle: Pipeline completed successfully!", 1.0)
-        return payload
 
 # Sidebar con informazioni sistema
 with st.sidebar:
@@ -421,12 +771,10 @@ with st.sidebar:
     st.subheader("Architettura Pipeline")
     st.markdown("""
     **Flow Stages:**
-    1. Question Validation :material/search:
-    2. Ethics Check :material/balance:
-    3. RAG Analysis (Local KB) :material/note_stack:
-    4. Web Analysis :material/captive_portal:
-    5. Document Generation :material/contract_edit:
-    6. Bias Check :material/fact_check:
+    1. Question Validation (aeronautic relevance + ethics, single check) :material/search: :material/balance:
+    2. RAG Analysis (Local KB) + Web Analysis, in parallel :material/note_stack: :material/captive_portal:
+    3. Document Generation :material/contract_edit:
+    4. Bias Check :material/fact_check:
     """)
     
     st.markdown("---")
@@ -481,6 +829,11 @@ with tab1:
         show_metrics = st.toggle("Show RAGAS metrics", value=True)
         show_context = st.toggle("Show retrieved context", value=False)
     
+    # Il click su Cancel causa un rerun: qui si segnala al Flow in corso di fermarsi
+    if st.session_state.get("cancel_pipeline") and "_cancel_event" in st.session_state:
+        st.session_state.pop("_cancel_event").set()
+        st.warning(":material/cancel: Pipeline annullata: si fermerà al termine dello step in corso.")
+    
     # Execute button sotto la text area con la stessa larghezza
     with col1:
         if st.button("Execute Pipeline", type="primary", use_container_width=True):
@@ -502,10 +855,27 @@ with tab1:
                     # Crea il Flow con UI integration
                     aeronautic_rag_flow = AeronauticRagFlow()
                     aeronautic_rag_flow.state.question_input = question
-                    aeronautic_rag_flow.set_ui_components(status_text, progress_bar)
+                    stream_box = st.empty()
+                    aeronautic_rag_flow.set_ui_components(status_text, progress_bar, stream_box)
                     
-                    # Esegui il Flow - ora con step reali visibili
-                    aeronautic_rag_flow.kickoff()
+                    # Esegui il Flow in background - ora con step reali visibili.
+                    # La cache semantica è consultata dal Flow dopo la validazione
+                    st.session_state["_cancel_event"] = aeronautic_rag_flow.cancel_event
+                    future = get_executor().submit(aeronautic_rag_flow.kickoff)
+                    st.button(":material/cancel: Cancel", key="cancel_pipeline")
+                    while not future.done():
+                        aeronautic_rag_flow.render_ui()
+                        time.sleep(0.1)
+                    st.session_state.pop("_cancel_event", None)
+                    stream_box.empty()
+                    future.result()
+                    if aeronautic_rag_flow.cache_hit:
+                        st.info(":material/bolt: Risposta recuperata dalla cache semantica (domanda già elaborata).")
+                    elif aeronautic_rag_flow.state.final_doc and not aeronautic_rag_flow.state.validation_error:
+                        get_semantic_cache().add(question, {
+                            field: getattr(aeronautic_rag_flow.state, field)
+                            for field in CACHED_STATE_FIELDS
+                        })
                     
                     # Verifica se ci sono errori di validazione
                     if aeronautic_rag_flow.state.validation_error:
@@ -567,11 +937,8 @@ with tab1:
                             st.markdown("## :material/finance: Quality Metrics")
                             
                             try:
-                                try:
-                                    # Prova formato JSON standard
-                                    with open("output/rag_eval_results.json", "r") as f:
-                                        metrics_data = json.load(f)
-                                    
+                                metrics_data, _ = load_metrics(METRICS_PATH, os.path.getmtime(METRICS_PATH))
+                                if isinstance(metrics_data, dict):
                                     cols = st.columns(5)
                                     metric_names = {
                                         'answer_relevancy': ('Relevancy', ':material/target:'),
@@ -587,9 +954,8 @@ with tab1:
                                                 f"{icon} {label}",
                                                 f"{metrics_data[key]:.2%}"
                                             )
-                                except json.JSONDecodeError:
-                                    df = pd.read_json("output/rag_eval_results.json", lines=True)
-                                    metrics_data = df.iloc[-1].to_dict()  
+                                else:
+                                    df = metrics_data
 
                                     display_cols = ['user_input', 
                                                     'response',
@@ -613,40 +979,37 @@ with tab1:
                         if show_context:
                             st.markdown("---")
                             st.markdown("## :material/note_stack: Retrieved Context")
-                            try:
-                                with open("output/last_context.txt", "r", encoding="utf-8") as f:
-                                    rag_context = f.read()
+                            if aeronautic_rag_flow.state.rag_context:
                                 with st.expander("View RAG Context"):
-                                    st.text(rag_context)
-                            except FileNotFoundError:
-                                st.info("Context file not available.")
-                            except Exception as e:
-                                st.warning(f"Could not load context: {str(e)}")
+                                    st.text(aeronautic_rag_flow.state.rag_context)
+                            else:
+                                st.info("Context not available.")
                         
                         # Download options
                         st.markdown("---")
                         st.markdown("### :material/download: Downloads")
                         col1, col2, col3 = st.columns(3)
+                        n_runs = len(st.session_state.get('execution_history', []))
                         
                         with col1:
-                            download_link = create_download_link(
-                                aeronautic_rag_flow.state.final_doc,
-                                f"aeronautic_answer_{len(st.session_state.get('execution_history', []))}.md",
-                                ":material/description: Final Document"
+                            st.download_button(
+                                label=":material/description: Final Document",
+                                data=aeronautic_rag_flow.state.final_doc,
+                                file_name=f"aeronautic_answer_{n_runs}.md",
+                                mime="text/markdown",
+                                use_container_width=True
                             )
-                            st.markdown(download_link, unsafe_allow_html=True)
                         
                         with col2:
-                            try:
-                                with open("output/last_context.txt", "r", encoding="utf-8") as f:
-                                    context = f.read()
-                                download_link = create_download_link(
-                                    context,
-                                    f"rag_context_{len(st.session_state.get('execution_history', []))}.txt",
-                                    ":material/note_stack: RAG Context"
+                            if aeronautic_rag_flow.state.rag_context:
+                                st.download_button(
+                                    label=":material/note_stack: RAG Context",
+                                    data=aeronautic_rag_flow.state.rag_context,
+                                    file_name=f"rag_context_{n_runs}.txt",
+                                    mime="text/plain",
+                                    use_container_width=True
                                 )
-                                st.markdown(download_link, unsafe_allow_html=True)
-                            except:
+                            else:
                                 st.button(
                                     label=":material/note_stack: RAG Context",
                                     disabled=True,
@@ -655,14 +1018,14 @@ with tab1:
                         
                         with col3:
                             try:
-                                with open("output/rag_eval_results.json", "r") as f:
-                                    metrics_json = f.read()
-                                download_link = create_download_link(
-                                    metrics_json,
-                                    f"metrics_{len(st.session_state.get('execution_history', []))}.json",
-                                    ":material/analytics: RAGAS Metrics"
+                                _, metrics_json = load_metrics(METRICS_PATH, os.path.getmtime(METRICS_PATH))
+                                st.download_button(
+                                    label=":material/analytics: RAGAS Metrics",
+                                    data=metrics_json,
+                                    file_name=f"metrics_{n_runs}.json",
+                                    mime="application/json",
+                                    use_container_width=True
                                 )
-                                st.markdown(download_link, unsafe_allow_html=True)
                             except:
                                 st.button(
                                     label=":material/analytics: RAGAS Metrics",
@@ -671,16 +1034,17 @@ with tab1:
                                 )
                         
                         # Save to history
-                        st.session_state.execution_history.append({
-                            'question': question,
-                            'rag_result': aeronautic_rag_flow.state.rag_result,
-                            'web_result': aeronautic_rag_flow.state.web_result,
-                            'document': aeronautic_rag_flow.state.document,
-                            'final_document': aeronautic_rag_flow.state.final_doc
-                            # 'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                        })
+                        st.session_state.execution_history.append(
+                            save_history(question, aeronautic_rag_flow.state)
+                        )
                         # Query count now tracked by execution_history length
                         
+                except FlowCancelled:
+                    st.session_state.pop("_cancel_event", None)
+                    progress_bar.empty()
+                    status_text.empty()
+                    stream_box.empty()
+                    st.warning(":material/cancel: Pipeline annullata dall'utente.")
                 except Exception as e:
                     st.error(f":material/close: Error during execution: {str(e)}")
                     with st.expander("Error Details"):
@@ -690,12 +1054,19 @@ with tab2:
     st.header(":material/history: Execution History")
     
     if 'execution_history' in st.session_state and st.session_state.execution_history:
-        for idx, item in enumerate(reversed(st.session_state.execution_history)):
+        # Solo le esecuzioni più recenti; le altre dietro "Load more"
+        history_limit = st.session_state.setdefault("history_limit", HISTORY_PAGE_SIZE)
+        recent = islice(reversed(st.session_state.execution_history), history_limit)
+        for idx, item in enumerate(recent):
             query_num = len(st.session_state.execution_history) - idx
             
             with st.expander(f"Query {query_num}: {item['question'][:80]}"):
                 st.markdown(f"**:material/question_mark: Question:** {item['question']}")
+                st.caption(item.get('ts', ''))
                 st.markdown("---")
+                # Risultati completi letti dal DB (le voci vecchie li hanno ancora in memoria)
+                if 'id' in item:
+                    item = {**item, **load_history_row(item['id'])}
                 
                 # Tabs per i risultati - usa .get() per gestire history vecchie
                 result_tabs = st.tabs([
@@ -725,6 +1096,12 @@ with tab2:
                     mime="text/markdown",
                     key=f"download_{idx}"
                 )
+        
+        hidden = len(st.session_state.execution_history) - history_limit
+        if hidden > 0:
+            if st.button(f":material/expand_more: Load more ({hidden} older)", key="history_load_more"):
+                st.session_state.history_limit += HISTORY_PAGE_SIZE
+                st.rerun()
     else:
         st.info("No execution history yet. Run a query to see results here.")
 
@@ -733,15 +1110,21 @@ with tab3:
     st.info("Click the button below to generate and display the flow diagram")
     
     if st.button(":material/device_hub: Generate Flow Diagram", use_container_width=False):
+        # La generazione gira nel pool di thread; il future sopravvive ai rerun
+        st.session_state["flow_future"] = get_executor().submit(generate_flow_html)
+    
+    flow_future = st.session_state.get("flow_future")
+    if flow_future is not None:
         with st.spinner("Generating flow visualization..."):
+            while not flow_future.done():
+                time.sleep(0.1)
+            st.session_state.pop("flow_future", None)
             try:
-                flow = AeronauticRagFlow()
-                flow.plot()
+                flow_future.result()
                 
                 # Il file è nella root del progetto
-                if os.path.exists("crewai_flow.html"):
-                    with open("crewai_flow.html", "r", encoding="utf-8") as f:
-                        html_content = f.read()
+                if os.path.exists(FLOW_HTML):
+                    html_content = load_flow_html(FLOW_HTML, os.path.getmtime(FLOW_HTML))
                     
                     st.components.v1.html(html_content, height=600, scrolling=True)
                     st.success("✅ Flow diagram generated and displayed above!")
@@ -1,11 +1,105 @@
-from typing import Type
+from typing import Any, Callable, NamedTuple, Type
+import functools
+import io
 import os
-import yaml
+import threading
+from urllib.parse import urlsplit
+from collections import OrderedDict
 from pathlib import Path
 
 from crewai.tools import BaseTool
-from pydantic import BaseModel, Field
-from crewai_tools import SerperDevTool
+from pydantic import BaseModel, Field, PrivateAttr
+
+# Cache LRU in-process delle risposte SerperDev, condivisa tra le istanze del tool
+_SEARCH_CACHE_SIZE = 1024
+_search_cache: "OrderedDict[tuple, dict]" = OrderedDict()
+# Output già filtrato e formattato, per (query, n_results, domini trusted)
+_output_cache: "OrderedDict[tuple, str]" = OrderedDict()
+# Le ricerche girano anche in thread paralleli: accesso alle cache serializzato
+# (la chiamata di rete resta fuori dal lock)
+_cache_lock = threading.Lock()
+
+_SERPER_SEARCH_URL = "https://google.serper.dev/search"
+
+_DOMAINS_YAML = Path(__file__).parent.parent / "crews" / "web_crew" / "config" / "domains.yaml"
+
+
+@functools.lru_cache(maxsize=4)
+def _load_domains_cached(path: str, signature: tuple) -> tuple:
+    """
+    Read and parse the trusted domains YAML file once per (path, signature).
+    
+    Parameters
+    ----------
+    path : str
+        Absolute path of the domains.yaml file
+    signature : tuple
+        ``(st_mtime_ns, st_size, st_ino)`` of the file, part of the cache
+        key so that an edited or replaced file is parsed again
+        
+    Returns
+    -------
+    tuple
+        Immutable tuple of trusted domain names
+        
+    Notes
+    -----
+    Uses the libyaml-based ``CSafeLoader`` when PyYAML was built with it,
+    falling back to the pure-Python ``SafeLoader`` otherwise.
+    """
+    import yaml
+
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    with open(path, 'r', encoding='utf-8') as file:
+        config = yaml.load(file, Loader=loader)
+    return tuple(config.get('trusted_domains', []))
+
+
+@functools.lru_cache(maxsize=4096)
+def _is_trusted_host(host: str, trusted: frozenset) -> bool:
+    """
+    Check whether a host or any of its parent domains is in the trusted set.
+    
+    Parameters
+    ----------
+    host : str
+        Lowercased host name (as returned by ``urlsplit(url).hostname``)
+    trusted : frozenset
+        Trusted domain names
+        
+    Returns
+    -------
+    bool
+        True if ``host`` equals a trusted domain or is one of its subdomains
+        
+    Notes
+    -----
+    Memoized per host, since sitelinks and People Also Ask entries often
+    repeat the hosts of the organic results.
+    """
+    parts = host.split(".")
+    return any(".".join(parts[i:]) in trusted for i in range(len(parts)))
+
+
+class Sitelink(NamedTuple):
+    """Trusted sitelink of an organic search result."""
+    title: str
+    link: str
+
+
+class OrganicResult(NamedTuple):
+    """
+    Trusted organic search result.
+    
+    A NamedTuple instead of a dict: results are built once per search and
+    only read afterwards, so the compact immutable layout and attribute
+    access are enough.
+    """
+    title: str
+    link: str
+    snippet: str
+    position: Any
+    sitelinks: tuple = ()
 
 
 class TrustedWebSearchInput(BaseModel):
@@ -42,6 +136,9 @@ class TrustedWebSearch(BaseTool):
         The Pydantic model defining input schema for this tool
     serper_tool : SerperDevTool
         The underlying SerperDev tool instance for web searching
+    session : requests.Session, optional
+        Dedicated HTTP session for the Serper API; when set, searches are
+        sent through it instead of the process-wide ``requests`` functions
     trusted_domains : list
         List of trusted domain names to filter search results
         
@@ -53,24 +150,34 @@ class TrustedWebSearch(BaseTool):
         Get default trusted domains as fallback
     _is_trusted_domain(url: str) -> bool
         Check if a URL belongs to a trusted domain
-    _process_organic_results(organic_results: list) -> list
+    _trust_checker() -> Callable[[str], bool]
+        Build a trusted-domain check memoized per URL for a single response
+    _process_organic_results(organic_results: list, trust: Callable = None) -> list
         Filter organic search results by trusted domains
-    _process_people_also_ask(paa_results: list) -> list
+    _process_people_also_ask(paa_results: list, trust: Callable = None) -> list
         Filter People Also Ask results by trusted domains
-    _process_knowledge_graph(kg: dict) -> dict
+    _process_knowledge_graph(kg: dict, trust: Callable = None) -> dict
         Filter Knowledge Graph data by trusted domains
     _process_related_searches(related_results: list) -> list
         Process related search suggestions
     _format_output(trusted_data: dict, search_params: dict) -> str
         Format filtered results into readable output
+    _search(search_query: str) -> dict
+        Run the SerperDev search, reusing cached responses for repeated queries
+    _serper_request(search_query: str) -> dict
+        Call the Serper search API through the dedicated session
     _run(search_query: str) -> str
         Execute the search and return filtered results
+    _extract_trusted(results: dict) -> dict
+        Filter a raw SerperDev response by trusted domains
     """
     name: str = "Trusted Web Search"
     description: str = "Search web using only trusted domains"
     args_schema: Type[BaseModel] = TrustedWebSearchInput
-    serper_tool: SerperDevTool = None
+    serper_tool: Any = None  # SerperDevTool, importato alla creazione del tool
     trusted_domains: list = None
+    _trusted_set: frozenset = PrivateAttr(default=frozenset())
+    _session: Any = PrivateAttr(default=None)
     
     def _load_trusted_domains(self) -> list:
         """
@@ -78,7 +185,8 @@ class TrustedWebSearch(BaseTool):
         
         This method loads a list of trusted domain names from a YAML configuration
         file located in the crews/web_crew/config/domains.yaml path. If the file
-        cannot be loaded or parsed, it falls back to default domains.
+        cannot be loaded or parsed, it falls back to default domains. The parsed
+        file is memoized by path, modification time, size and inode.
         
         Returns
         -------
@@ -93,15 +201,17 @@ class TrustedWebSearch(BaseTool):
         yaml.YAMLError
             If the YAML file cannot be parsed (handled gracefully)
         """
+        import yaml
+
         # Percorso relativo al file YAML dalla posizione corrente
-        yaml_path = Path(__file__).parent.parent / "crews" / "web_crew" / "config" / "domains.yaml"
+        yaml_path = _DOMAINS_YAML
         
         try:
-            with open(yaml_path, 'r', encoding='utf-8') as file:
-                config = yaml.safe_load(file)
-                domains = config.get('trusted_domains', [])
-                # print(f"Caricati {len(domains)} domini trusted da {yaml_path}")
-                return domains
+            # Il parsing è memorizzato per (path, mtime_ns, size, inode): le istanze
+            # successive non rileggono il file finché non viene modificato o sostituito
+            st = os.stat(yaml_path)
+            signature = (st.st_mtime_ns, st.st_size, st.st_ino)
+            return list(_load_domains_cached(str(yaml_path), signature))
         except FileNotFoundError:
             print(f"File {yaml_path} non trovato, uso domini di default")
             return self._get_default_domains()
@@ -132,7 +242,7 @@ class TrustedWebSearch(BaseTool):
             'python.org', 'nature.com', 'gov.it'
         ]
     
-    def __init__(self, api_key: str, n_results: int = 10):
+    def __init__(self, api_key: str, n_results: int = 10, session=None):
         """
         Initialize the TrustedWebSearch tool with API configuration.
         
@@ -146,6 +256,10 @@ class TrustedWebSearch(BaseTool):
             The API key for SerperDev service used for web searches
         n_results : int, default=10
             Maximum number of search results to retrieve from SerperDev
+        session : requests.Session, optional
+            Session used for the Serper API calls (e.g. with custom TLS or
+            retry settings). Its configuration applies to these calls only;
+            without it, the search goes through SerperDevTool
             
         Notes
         -----
@@ -159,17 +273,22 @@ class TrustedWebSearch(BaseTool):
         os.environ["SERPER_API_KEY"] = api_key
         
         # Inizializza SerperDevTool con parametri completi
+        # (import differito: crewai_tools è pesante e serve solo qui)
+        from crewai_tools import SerperDevTool
+
         self.serper_tool = SerperDevTool(n_results=n_results)
+        self._session = session
         # Carica domini trusted dal file YAML
         self.trusted_domains = self._load_trusted_domains()
+        self._trusted_set = frozenset(d.lower() for d in self.trusted_domains)
     
     def _is_trusted_domain(self, url: str) -> bool:
         """
         Check if a URL belongs to a trusted domain.
         
-        This method verifies whether the given URL contains any of the
-        trusted domain names loaded from the configuration. It performs
-        a substring match to determine if the URL is from a trusted source.
+        This method verifies whether the host of the given URL is one of the
+        trusted domain names loaded from the configuration, or a subdomain
+        of one of them.
         
         Parameters
         ----------
@@ -179,16 +298,49 @@ class TrustedWebSearch(BaseTool):
         Returns
         -------
         bool
-            True if the URL contains any trusted domain name, False otherwise
+            True if the URL host is a trusted domain or one of its subdomains,
+            False otherwise
             
         Notes
         -----
-        Uses substring matching, so 'example.com' will match URLs like
-        'https://subdomain.example.com/path'
+        Matches host suffixes on label boundaries, so 'example.com' matches
+        'https://subdomain.example.com/path' but not 'https://notexample.com'
+        or 'https://example.com.evil.net'.
+        """
+        if not self._trusted_set and self.trusted_domains:
+            self._trusted_set = frozenset(d.lower() for d in self.trusted_domains)
+        try:
+            host = urlsplit(url).hostname or ""
+        except ValueError:
+            return False
+        return _is_trusted_host(host, self._trusted_set)
+    
+    def _trust_checker(self) -> Callable[[str], bool]:
+        """
+        Build a trusted-domain check memoized per URL for a single response.
+        
+        The sections of a response are filtered in one pass each, and every
+        distinct URL is checked the first time it is met; URLs that are never
+        reached (e.g. sitelinks of untrusted results) are never checked.
+        
+        Returns
+        -------
+        Callable[[str], bool]
+            Function returning True if the URL belongs to a trusted domain
+            (False for empty URLs)
         """
-        return any(domain in url for domain in self.trusted_domains)
+        cache = {}
+        is_trusted_domain = self._is_trusted_domain
+        
+        def trusted(url: str) -> bool:
+            verdict = cache.get(url)
+            if verdict is None:
+                verdict = cache[url] = bool(url) and is_trusted_domain(url)
+            return verdict
+        
+        return trusted
     
-    def _process_organic_results(self, organic_results: list) -> list:
+    def _process_organic_results(self, organic_results: list, trust: Callable = None) -> list:
         """
         Process organic search results filtering by trusted domains.
         
@@ -200,45 +352,41 @@ class TrustedWebSearch(BaseTool):
         ----------
         organic_results : list
             List of organic search result dictionaries from SerperDev API
+        trust : Callable[[str], bool], optional
+            Memoized check shared by the whole response (see
+            ``_trust_checker``); defaults to ``_is_trusted_domain``
             
         Returns
         -------
-        list
+        List[OrganicResult]
             Filtered list containing only results from trusted domains,
-            each with title, link, snippet, position, and optional sitelinks
+            each with title, link, snippet, position, and a (possibly empty)
+            tuple of Sitelink
             
         Notes
         -----
         Sitelinks within each result are also filtered to include only
         those from trusted domains
         """
-        trusted_organic = []
-        for result in organic_results:
-            link = result.get("link", "")
-            if self._is_trusted_domain(link):
-                trusted_result = {
-                    "title": result.get("title", ""),
-                    "link": link,
-                    "snippet": result.get("snippet", ""),
-                    "position": result.get("position", ""),
-                }
-                
-                # Aggiungi sitelinks se presenti e trusted
-                if "sitelinks" in result:
-                    trusted_sitelinks = []
-                    for sitelink in result["sitelinks"]:
-                        if self._is_trusted_domain(sitelink.get("link", "")):
-                            trusted_sitelinks.append({
-                                "title": sitelink.get("title", ""),
-                                "link": sitelink.get("link", "")
-                            })
-                    if trusted_sitelinks:
-                        trusted_result["sitelinks"] = trusted_sitelinks
-                
-                trusted_organic.append(trusted_result)
-        return trusted_organic
+        is_trusted = trust or self._is_trusted_domain
+        # Sitelinks filtrati solo per i risultati già trusted
+        return [
+            OrganicResult(
+                result.get("title", ""),
+                link,
+                result.get("snippet", ""),
+                result.get("position", ""),
+                tuple(
+                    Sitelink(sitelink.get("title", ""), sl_link)
+                    for sitelink in result.get("sitelinks", ())
+                    if is_trusted(sl_link := sitelink.get("link", ""))
+                ),
+            )
+            for result in organic_results
+            if is_trusted(link := result.get("link", ""))
+        ]
     
-    def _process_people_also_ask(self, paa_results: list) -> list:
+    def _process_people_also_ask(self, paa_results: list, trust: Callable = None) -> list:
         """
         Process People Also Ask results filtering by trusted domains.
         
@@ -250,6 +398,9 @@ class TrustedWebSearch(BaseTool):
         ----------
         paa_results : list
             List of People Also Ask result dictionaries from SerperDev API
+        trust : Callable[[str], bool], optional
+            Memoized check shared by the whole response (see
+            ``_trust_checker``); defaults to ``_is_trusted_domain``
             
         Returns
         -------
@@ -262,19 +413,19 @@ class TrustedWebSearch(BaseTool):
         Results without links are included as they typically represent
         general knowledge that doesn't require source verification
         """
-        trusted_paa = []
-        for result in paa_results:
-            link = result.get("link", "")
-            if not link or self._is_trusted_domain(link):
-                trusted_paa.append({
-                    "question": result.get("question", ""),
-                    "snippet": result.get("snippet", ""),
-                    "title": result.get("title", ""),
-                    "link": link
-                })
-        return trusted_paa
+        is_trusted = trust or self._is_trusted_domain
+        return [
+            {
+                "question": result.get("question", ""),
+                "snippet": result.get("snippet", ""),
+                "title": result.get("title", ""),
+                "link": link
+            }
+            for result in paa_results
+            if not (link := result.get("link", "")) or is_trusted(link)
+        ]
     
-    def _process_knowledge_graph(self, kg: dict) -> dict:
+    def _process_knowledge_graph(self, kg: dict, trust: Callable = None) -> dict:
         """
         Process Knowledge Graph data if from trusted source.
         
@@ -287,6 +438,9 @@ class TrustedWebSearch(BaseTool):
         kg : dict
             Knowledge Graph data dictionary from SerperDev API containing
             title, type, website, description, and attributes
+        trust : Callable[[str], bool], optional
+            Memoized check shared by the whole response (see
+            ``_trust_checker``); defaults to ``_is_trusted_domain``
             
         Returns
         -------
@@ -301,7 +455,8 @@ class TrustedWebSearch(BaseTool):
         are included in the output
         """
         kg_website = kg.get("website", "")
-        if kg_website and self._is_trusted_domain(kg_website):
+        is_trusted = trust or self._is_trusted_domain
+        if kg_website and is_trusted(kg_website):
             return {
                 "title": kg.get("title", ""),
                 "type": kg.get("type", ""),
@@ -369,7 +524,9 @@ class TrustedWebSearch(BaseTool):
         Knowledge Graph results are prioritized and displayed first,
         followed by organic results, People Also Ask, and related searches
         """
-        output_lines = []
+        buf = io.StringIO()
+        # write legato una volta sola; ogni riga termina con "\n"
+        w = buf.write
         
         # Header con parametri di ricerca
         total_trusted = (
@@ -377,60 +534,126 @@ class TrustedWebSearch(BaseTool):
             (1 if trusted_data.get("knowledgeGraph") else 0)
         )
         
-        output_lines.append(f"TRUSTED SEARCH RESULTS")
-        output_lines.append(f"Query: {search_params.get('q', '')}")
-        output_lines.append(f"Total trusted sources found: {total_trusted}")
-        output_lines.append("=" * 60)
-        output_lines.append("")
+        w(f"TRUSTED SEARCH RESULTS\n"
+          f"Query: {search_params.get('q', '')}\n"
+          f"Total trusted sources found: {total_trusted}\n"
+          f"{'=' * 60}\n"
+          f"\n")
         
         # Knowledge Graph (prioritario)
         if "knowledgeGraph" in trusted_data:
             kg = trusted_data["knowledgeGraph"]
-            output_lines.append("KNOWLEDGE GRAPH")
-            output_lines.append(f"**{kg.get('title', '')}** ({kg.get('type', '')})")
-            output_lines.append(f"Source: {kg.get('website', '')}")
-            output_lines.append(f"{kg.get('description', '')}")
+            w(f"KNOWLEDGE GRAPH\n"
+              f"**{kg.get('title', '')}** ({kg.get('type', '')})\n"
+              f"Source: {kg.get('website', '')}\n"
+              f"{kg.get('description', '')}\n")
             if kg.get('attributes'):
-                output_lines.append("Key Attributes:")
+                w("Key Attributes:\n")
                 for key, value in kg.get('attributes', {}).items():
-                    output_lines.append(f"   • {key}: {value}")
-            output_lines.append("")
+                    w(f"   • {key}: {value}\n")
+            w("\n")
         
-        # Risultati organici
+        # Risultati organici: un solo write per risultato
         if "organic" in trusted_data:
-            output_lines.append("ORGANIC RESULTS")
+            w("ORGANIC RESULTS\n")
             for i, result in enumerate(trusted_data["organic"], 1):
-                output_lines.append(f"{i}. **{result.get('title', '')}**")
-                output_lines.append(f" {result.get('link', '')}")
-                output_lines.append(f"{result.get('snippet', '')}")
-                output_lines.append(f"Position: {result.get('position', 'N/A')}")
+                w(f"{i}. **{result.title}**\n"
+                  f" {result.link}\n"
+                  f"{result.snippet}\n"
+                  f"Position: {result.position}\n")
                 
                 # Sitelinks se presenti
-                if result.get('sitelinks'):
-                    output_lines.append("   🔗 Related links:")
-                    for sitelink in result['sitelinks']:
-                        output_lines.append(f"      • {sitelink.get('title', '')}: {sitelink.get('link', '')}")
-                output_lines.append("")
+                if result.sitelinks:
+                    w("   🔗 Related links:\n")
+                    w("".join(f"      • {sitelink.title}: {sitelink.link}\n" for sitelink in result.sitelinks))
+                w("\n")
         
         # People Also Ask
         if "peopleAlsoAsk" in trusted_data:
-            output_lines.append("PEOPLE ALSO ASK")
+            w("PEOPLE ALSO ASK\n")
             for i, paa in enumerate(trusted_data["peopleAlsoAsk"], 1):
-                output_lines.append(f"{i}. Q: {paa.get('question', '')}")
+                w(f"{i}. Q: {paa.get('question', '')}\n")
                 if paa.get('snippet'):
-                    output_lines.append(f"   A: {paa.get('snippet', '')}")
+                    w(f"   A: {paa.get('snippet', '')}\n")
                 if paa.get('link'):
-                    output_lines.append(f"  {paa.get('link', '')}")
-                output_lines.append("")
+                    w(f"  {paa.get('link', '')}\n")
+                w("\n")
         
         # Ricerche correlate
         if "relatedSearches" in trusted_data:
-            output_lines.append("RELATED SEARCHES")
+            w("RELATED SEARCHES\n")
             for search in trusted_data["relatedSearches"]:
-                output_lines.append(f"   • {search.get('query', '')}")
-            output_lines.append("")
+                w(f"   • {search.get('query', '')}\n")
+            w("\n")
+        
+        # Senza l'ultimo "\n": stesso testo del precedente "\n".join delle righe
+        return buf.getvalue()[:-1]
+    
+    def _search(self, search_query: str) -> dict:
+        """
+        Run the SerperDev search, reusing cached responses for repeated queries.
+        
+        Responses are kept in a process-wide LRU cache keyed by the normalized
+        query (lowercased, whitespace collapsed) and the number of results, so
+        agents retrying the same search do not pay another API round-trip.
+        Cache access is guarded by a lock, since the web crew may search from
+        several threads at once; the API call itself runs outside the lock.
         
-        return "\n".join(output_lines)
+        Parameters
+        ----------
+        search_query : str
+            The search query string to be executed
+            
+        Returns
+        -------
+        dict
+            Raw SerperDev response for the query
+        """
+        key = (" ".join(search_query.split()).lower(), self.serper_tool.n_results)
+        with _cache_lock:
+            if key in _search_cache:
+                _search_cache.move_to_end(key)
+                return _search_cache[key]
+        
+        if self._session is not None:
+            results = self._serper_request(search_query)
+        else:
+            results = self.serper_tool._run(search_query=search_query)
+        with _cache_lock:
+            _search_cache[key] = results
+            if len(_search_cache) > _SEARCH_CACHE_SIZE:
+                _search_cache.popitem(last=False)
+        return results
+    
+    def _serper_request(self, search_query: str) -> dict:
+        """
+        Call the Serper search API through the tool's dedicated session.
+        
+        Parameters
+        ----------
+        search_query : str
+            The search query string to be executed
+            
+        Returns
+        -------
+        dict
+            Raw Serper response, with the same sections used by SerperDevTool
+            ('organic', 'knowledgeGraph', 'peopleAlsoAsk', 'relatedSearches',
+            'searchParameters')
+            
+        Raises
+        ------
+        requests.HTTPError
+            If the API answers with an error status
+        """
+        response = self._session.post(
+            _SERPER_SEARCH_URL,
+            json={"q": search_query, "num": self.serper_tool.n_results},
+            headers={"X-API-KEY": os.environ["SERPER_API_KEY"]},
+            timeout=30,
+        )
+        response.raise_for_status()
+        return response.json()
     
     def _run(self, search_query: str) -> str:
         """
@@ -456,29 +679,67 @@ class TrustedWebSearch(BaseTool):
         Notes
         -----
         If no trusted sources are found, returns a message with the total
-        number of available results and suggests expanding the trusted domains list
+        number of available results and suggests expanding the trusted domains list.
+        The formatted output is cached per normalized query, number of results
+        and trusted domain set, so repeated searches skip both the API call and
+        the filtering/formatting work.
         """
+        key = (" ".join(search_query.split()).lower(), self.serper_tool.n_results, self._trusted_set)
+        with _cache_lock:
+            if key in _output_cache:
+                _output_cache.move_to_end(key)
+                return _output_cache[key]
         # Ricerca completa con SerperDevTool
-        results = self.serper_tool._run(search_query=search_query)
+        results = self._search(search_query)
+        trusted_data = self._extract_trusted(results)
+        
+        # Formatta output finale
+        if trusted_data:
+            output = self._format_output(trusted_data, results.get("searchParameters", {}))
+        else:
+            total_results = len(results.get("organic", []))
+            output = f"NO TRUSTED SOURCES FOUND\nTotal results available: {total_results}\nConsider expanding trusted domains list."
+        with _cache_lock:
+            _output_cache[key] = output
+            if len(_output_cache) > _SEARCH_CACHE_SIZE:
+                _output_cache.popitem(last=False)
+        return output
+    
+    def _extract_trusted(self, results: dict) -> dict:
+        """
+        Filter a raw SerperDev response by trusted domains.
+        
+        Parameters
+        ----------
+        results : dict
+            Raw SerperDev response
+            
+        Returns
+        -------
+        dict
+            Trusted data by section, as consumed by ``_format_output``
+        """
+        # Verdetti memorizzati per URL, condivisi da tutte le sezioni
+        trust = self._trust_checker()
         
         # Estrai dati trusted da tutte le sezioni
         trusted_data = {}
         
         # Processa risultati organici
         if "organic" in results:
-            trusted_organic = self._process_organic_results(results["organic"])
+            trusted_organic = self._process_organic_results(results["organic"], trust)
             if trusted_organic:
                 trusted_data["organic"] = trusted_organic
         
         # Processa Knowledge Graph
         if "knowledgeGraph" in results:
-            trusted_kg = self._process_knowledge_graph(results["knowledgeGraph"])
+            trusted_kg = self._process_knowledge_graph(results["knowledgeGraph"], trust)
             if trusted_kg:
                 trusted_data["knowledgeGraph"] = trusted_kg
         
         # Processa People Also Ask
         if "peopleAlsoAsk" in results:
-            trusted_paa = self._process_people_also_ask(results["peopleAlsoAsk"])
+            trusted_paa = self._process_people_also_ask(results["peopleAlsoAsk"], trust)
             if trusted_paa:
                 trusted_data["peopleAlsoAsk"] = trusted_paa
         
@@ -486,9 +747,4 @@ class TrustedWebSearch(BaseTool):
         if "relatedSearches" in results:
             trusted_data["relatedSearches"] = self._process_related_searches(results["relatedSearches"])
         
-        # Formatta output finale
-        if trusted_data:
-            return self._format_output(trusted_data, results.get("searchParameters", {}))
-        else:
-            total_results = len(results.get("organic", []))
-            return f"NO TRUSTED SOURCES FOUND\nTotal results available: {total_results}\nConsider expanding trusted domains list."
\ No newline at end of file
+        return trusted_data
\ No newline at end of file
@@ -1,7 +1,6 @@
 
 from __future__ import annotations
 
-from dotenv import load_dotenv
 from dataclasses import dataclass
 
 @dataclass
@@ -42,6 +41,10 @@ class Settings:
         Whether to use MMR for result diversification and redundancy reduction
     mmr_lambda : float, default=0.6
         MMR parameter balancing relevance vs. diversity (0.0 to 1.0)
+    use_rerank : bool, default=False
+        Whether to re-rank the fused candidates with a cross-encoder
+    rerank_model : str, default="cross-encoder/ms-marco-MiniLM-L-6-v2"
+        Cross-encoder model used for re-ranking
     lm_base_env : str, default="OPENAI_BASE_URL"
         Environment variable name for LLM service base URL
     lm_key_env : str, default="OPENAI_API_KEY"
@@ -330,6 +333,30 @@ class Settings:
     - Increase if results seem too diverse
     """
     
+    use_rerank: bool = False
+    """
+    Whether to re-rank the fused candidates with a cross-encoder.
+    
+    Re-ranking Behavior:
+    - The top ``final_k * 5`` fused candidates are scored jointly with the
+      query by a small cross-encoder and the best ``final_k`` are kept
+    - Replaces MMR selection when enabled
+    
+    Trade-offs:
+    - Better precision of the chunks passed to the LLM
+    - Adds a local model forward pass (~tens of ms on CPU for 30 pairs)
+    - First use downloads the model from the Hugging Face Hub
+    """
+    
+    rerank_model: str = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+    """
+    Cross-encoder model used when ``use_rerank`` is enabled.
+    
+    Model Options:
+    - ms-marco-MiniLM-L-6-v2: Fast, English-centric (default)
+    - mmarco-mMiniLMv2-L12-H384-v1: Multilingual, better for Italian documents
+    """
+    
     lm_base_env: str = "OPENAI_BASE_URL"
     """
     Environment variable name for LLM service base URL.
@@ -376,5 +403,3 @@ class Settings:
     - LM Studio: LMSTUDIO_MODEL=llama-2-7b-chat
     - Ollama: LMSTUDIO_MODEL=llama2:7b
     """
-
-load_dotenv()
\ No newline at end of file
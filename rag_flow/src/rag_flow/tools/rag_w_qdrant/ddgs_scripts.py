@@ -1,3 +1,4 @@
+import importlib.util
 import warnings
 
 import bs4
@@ -9,6 +10,79 @@ from .utils import clean_web_content
 
 warnings.filterwarnings("ignore", category=UserWarning)
 
+# Parser C di libxml2 se installato (dipendenza di unstructured), altrimenti html.parser
+_BS_FEATURES = "lxml" if importlib.util.find_spec("lxml") else "html.parser"
+
+# Gruppi di selettori provati in ordine; gli SoupStrainer sono senza stato
+# e vengono creati una sola volta al caricamento del modulo
+_CONTENT_STRAINERS = (
+    ("article", bs4.SoupStrainer(["article"])),
+    ("main-content", bs4.SoupStrainer(["main", ".main", "#main"])),
+    (
+        "content-areas",
+        bs4.SoupStrainer(
+            [".content", ".post-content", ".article-content", ".entry-content"]
+        ),
+    ),
+    (
+        "text-body",
+        bs4.SoupStrainer([".text", ".body", ".story-body", ".article-body"]),
+    ),
+)
+
+
+def _fetch_html(path: str) -> str:
+    """
+    Download the raw HTML of a web page the way WebBaseLoader does.
+    
+    The request goes through a WebBaseLoader session, so it keeps the
+    loader's default headers, TLS verification and encoding detection, and
+    does not raise on error status codes (the error page is parsed and then
+    rejected by the content-length checks).
+    
+    Parameters
+    ----------
+    path : str
+        URL of the web page
+        
+    Returns
+    -------
+    str
+        Decoded HTML of the page
+        
+    Raises
+    ------
+    requests.RequestException
+        If the request itself fails (connection error, invalid URL, ...)
+    """
+    loader = WebBaseLoader(web_paths=(path,))
+    response = loader.session.get(path, **loader.requests_kwargs)
+    response.encoding = response.apparent_encoding
+    return response.text
+
+
+def _html_to_document(path: str, html: str, strainer=None) -> Document:
+    """
+    Parse already-downloaded HTML into a Document, optionally filtered.
+    
+    Parameters
+    ----------
+    path : str
+        Source URL, stored in the document metadata
+    html : str
+        Raw HTML of the page
+    strainer : bs4.SoupStrainer, optional
+        Restricts parsing to the matching elements; the whole page is
+        parsed when omitted
+        
+    Returns
+    -------
+    Document
+        Document with the page text and the source URL in its metadata
+    """
+    soup = bs4.BeautifulSoup(html, _BS_FEATURES, parse_only=strainer)
+    return Document(page_content=soup.get_text(), metadata={"source": path})
+
 
 def ddgs_results(query: str, max_results: int = 5):
     """
@@ -98,7 +172,8 @@ def web_search_and_format(path: str):
         
     Processing Pipeline
     ------------------
-    1. **Content Extraction**: Uses WebBaseLoader with CSS selectors for main content
+    1. **Content Extraction**: Downloads the page once, then parses it with
+       each group of content selectors in turn
     2. **Cleaning**: Applies clean_web_content() for noise reduction
     3. **Validation**: Filters out empty or overly short content
     4. **Formatting**: Creates Document objects with URL metadata
@@ -120,7 +195,10 @@ def web_search_and_format(path: str):
     
     Notes
     -----
-    - Uses BeautifulSoup parser for reliable HTML processing
+    - The HTML is downloaded a single time and every extraction strategy
+      (selector groups and unfiltered fallback) parses the same copy
+    - Uses BeautifulSoup with the lxml parser when available (html.parser
+      otherwise); the selector strainers are built once at import time
     - Applies domain-specific cleaning rules for Italian and English content
     - Minimum content length threshold of 100 characters
     - All results include source URL in metadata for citation purposes
@@ -128,41 +206,23 @@ def web_search_and_format(path: str):
     print(f"Caricamento contenuto da: {path}")
 
     try:
-        content_selectors = [
-            {"name": "article", "elements": ["article"]},
-            {"name": "main-content", "elements": ["main", ".main", "#main"]},
-            {
-                "name": "content-areas",
-                "elements": [
-                    ".content",
-                    ".post-content",
-                    ".article-content",
-                    ".entry-content",
-                ],
-            },
-            {
-                "name": "text-body",
-                "elements": [".text", ".body", ".story-body", ".article-body"],
-            },
-        ]
+        # Unico download: tutti i tentativi lavorano sullo stesso HTML
+        try:
+            html = _fetch_html(path)
+        except Exception as e:
+            print(f"Errore nel download di {path}: {e}")
+            html = ""
 
         valid_docs = []
 
-        for selector_group in content_selectors:
+        for name, strainer in _CONTENT_STRAINERS if html else ():
             if valid_docs:  
                 break
 
             try:
-                loader = WebBaseLoader(
-                    web_paths=(path,),
-                    bs_kwargs=dict(
-                        parse_only=bs4.SoupStrainer(selector_group["elements"])
-                    ),
-                )
-
-                docs = loader.load()
+                docs = [_html_to_document(path, html, strainer)]
                 print(
-                    f"Tentativo con selettori {selector_group['name']}: {len(docs)} documenti"
+                    f"Tentativo con selettori {name}: {len(docs)} documenti"
                 )
 
                 for doc in docs:
@@ -179,26 +239,21 @@ def web_search_and_format(path: str):
                         break
 
             except Exception as e:
-                print(f"Errore con selettori {selector_group['name']}: {e}")
+                print(f"Errore con selettori {name}: {e}")
                 continue
 
-        if not valid_docs:
+        if not valid_docs and html:
             print("Nessun contenuto valido trovato, provo senza filtri CSS...")
             try:
-                loader = WebBaseLoader(web_paths=(path,))
-                docs = loader.load()
+                docs = [_html_to_document(path, html)]
 
                 for doc in docs:
                     cleaned_content = clean_web_content(doc.page_content)
 
-                    lines = cleaned_content.split("\n")
-                    content_lines = []
-
-                    for line in lines:
-                        line = line.strip()
-                        content_lines.append(line)
-
-                    final_content = " ".join(content_lines)
+                    # Righe ripulite e unite in un solo passaggio, saltando quelle vuote
+                    final_content = " ".join(
+                        line for line in map(str.strip, cleaned_content.splitlines()) if line
+                    )
 
                     if (
                         len(final_content.strip()) > 150
@@ -1,14 +1,11 @@
 from __future__ import annotations
 
-from dotenv import load_dotenv
- 
-
 from crewai.tools import tool
 from .ragas_scripts import ragas_evaluation
 from .azure_connections import get_azure_embedding_model, get_llm 
 from .rag_structure import build_rag_chain
 from .config import Settings
-from .utils import  load_documents, split_documents, scan_docs_folder, SimpleRetriever, format_docs_for_prompt
+from .utils import  load_documents, split_documents, scan_docs_folder, SimpleRetriever, CachedQueryEmbeddings, format_docs_for_prompt
 from .qdrant_script import (
     get_qdrant_client,
     recreate_collection_for_rag,
@@ -16,15 +13,257 @@ from .qdrant_script import (
     hybrid_search
 )
 
+import functools
+import hashlib
+import os
+import threading
 import warnings
 
-warnings.filterwarnings("ignore", category=UserWarning)
+try:
+    import orjson  # dipendenza di langsmith; serializer in Rust
+except ImportError:  # fallback sul writer di pandas
+    orjson = None
 
+warnings.filterwarnings("ignore", category=UserWarning)
 
-load_dotenv()
 
 SETTINGS = Settings()
 
+# Ultimo contesto passato al LLM, letto dal flow in memoria invece di
+# rileggere output/last_context.txt dal disco. È per-thread: il tool gira
+# nel thread della crew, quindi flow concorrenti non si sovrascrivono
+_local = threading.local()
+_index_lock = threading.Lock()
+# I file condivisi in output/ (ultimo contesto, metriche ragas) sono scritti
+# anche da flow concorrenti (kickoff_stream): una scrittura alla volta
+_output_lock = threading.Lock()
+
+# Impronta del corpus indicizzato, salvata accanto agli altri output (un file
+# per collection) così anche un nuovo processo può riusare la collection
+# già presente in Qdrant
+_FINGERPRINT_FILE = "output/rag_index_fingerprint_{collection}.txt"
+_indexed_fingerprint = None
+# Da incrementare quando cambia il layout della collection in qdrant_script
+# (HNSW, quantizzazione, payload): le collection esistenti vengono ricostruite
+_INDEX_SCHEMA_VERSION = 1
+# Cartella dei documenti indicizzati, relativa alla root del progetto
+_DOCS_DIR = "src\\rag_flow\\tools\\rag_w_qdrant\\docs_test"
+
+
+@functools.lru_cache(maxsize=1)
+def _rag_resources():
+    """
+    Build the embedding model, LLM, Qdrant client and retriever once per process.
+    
+    Returns
+    -------
+    tuple
+        ``(embeddings, llm, client, retriever)`` shared by every ``rag_system`` call;
+        the retriever searches through a ``CachedQueryEmbeddings`` proxy
+    """
+    s = SETTINGS
+    embeddings = get_azure_embedding_model(s)
+    llm = get_llm()
+    client = get_qdrant_client(s)
+    retriever = SimpleRetriever(client, s, CachedQueryEmbeddings(embeddings))
+    return embeddings, llm, client, retriever
+
+
+def _write_json_lines(df, path: str) -> None:
+    """
+    Write a DataFrame as JSON Lines (one record per line).
+    
+    Produces the same layout as ``df.to_json(path, orient="records", lines=True)``
+    but serializes the records with orjson when available, which is several
+    times faster than the pandas encoder.
+    
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        Frame to write (e.g. the ragas evaluation results)
+    path : str
+        Destination file, overwritten
+    """
+    if orjson is None:
+        df.to_json(path, orient="records", lines=True)
+        return
+    dumps = orjson.dumps
+    opts = orjson.OPT_SERIALIZE_NUMPY
+    with open(path, "wb") as f:
+        f.writelines(
+            dumps(rec, default=str, option=opts) + b"\n"
+            for rec in df.to_dict(orient="records")
+        )
+
+
+def _corpus_fingerprint(file_paths, s: Settings) -> str:
+    """
+    Hash the corpus and the settings that shape the indexed vectors.
+    
+    Parameters
+    ----------
+    file_paths : List[str]
+        Paths returned by ``scan_docs_folder``
+    s : Settings
+        Configuration used to chunk, embed and store the documents
+        
+    Returns
+    -------
+    str
+        Hex digest that changes whenever a document is added, removed or
+        modified, or when the Qdrant target, collection, chunking, embedding
+        deployment, vector size or collection layout changes
+    """
+    h = hashlib.sha1()
+    embedding_model = os.getenv("AZURE_EMBEDDING_MODEL", "text-embedding-ada-002")
+    h.update(
+        f"{_INDEX_SCHEMA_VERSION}|{s.qdrant_url}|{s.collection}|{s.chunk_size}|"
+        f"{s.chunk_overlap}|{s.vector_size}|{embedding_model}\n".encode("utf-8")
+    )
+    for path in sorted(file_paths):
+        st = os.stat(path)
+        h.update(f"{path}|{st.st_size}|{st.st_mtime_ns}\n".encode("utf-8"))
+    return h.hexdigest()
+
+
+def corpus_fingerprint() -> str:
+    """
+    Fingerprint of the current document corpus and index settings.
+    
+    Computed from the files on disk (not from the last ingestion), so
+    caches of generated answers can detect a corpus change even before the
+    next ``rag_system`` call re-indexes it.
+    
+    Returns
+    -------
+    str
+        Digest produced by ``_corpus_fingerprint`` for the docs folder
+    """
+    return _corpus_fingerprint(scan_docs_folder(_DOCS_DIR), SETTINGS)
+
+
+def _ensure_index(client, s, embeddings, doc_folder) -> None:
+    """
+    Ingest the corpus into Qdrant only if it changed since the last ingestion.
+    
+    Loading, chunking and embedding the documents and rebuilding the
+    collection dominate the cost of a ``rag_system`` call, but the corpus
+    rarely changes between questions. The collection is rebuilt only when
+    the fingerprint (corpus plus index-related settings, see
+    ``_corpus_fingerprint``) differs from the one recorded at the last
+    ingestion (in this process or, via the per-collection fingerprint file,
+    a previous one) or when the collection is missing from Qdrant.
+    
+    Parameters
+    ----------
+    client : QdrantClient
+        Qdrant database client
+    s : Settings
+        Configuration object containing collection parameters
+    embeddings : AzureOpenAIEmbeddings
+        Embedding model used for document vectors
+    doc_folder : List[str]
+        Paths of the documents to index
+    """
+    global _indexed_fingerprint
+    fingerprint = _corpus_fingerprint(doc_folder, s)
+    fingerprint_file = _FINGERPRINT_FILE.format(collection=s.collection)
+    if fingerprint == _indexed_fingerprint:
+        return
+
+    if _indexed_fingerprint is None and client.collection_exists(s.collection):
+        try:
+            with open(fingerprint_file, "r", encoding="utf-8") as f:
+                if f.read().strip() == fingerprint:
+                    _indexed_fingerprint = fingerprint
+                    return
+        except OSError:
+            pass
+
+    docs = load_documents(doc_folder)
+    chunks = split_documents(docs, s)
+    recreate_collection_for_rag(client, s, s.vector_size)
+    upsert_chunks(client, s, chunks, embeddings)
+
+    _indexed_fingerprint = fingerprint
+    try:
+        with open(fingerprint_file, "w", encoding="utf-8") as f:
+            f.write(fingerprint)
+    except OSError:
+        pass
+
+
+def prefetch_query_embeddings(questions) -> None:
+    """
+    Embed a batch of questions with one request before they are searched.
+    
+    Parameters
+    ----------
+    questions : Iterable[str]
+        Questions about to be answered, e.g. in a batch run
+        
+    Notes
+    -----
+    Searches for these exact strings then reuse the cached vectors instead
+    of issuing one embedding request each.
+    """
+    _rag_resources()[3].embeddings.prefetch(questions)
+
+
+def embed_query(question: str):
+    """
+    Embed a question with the RAG embedding model.
+    
+    The vector goes through the retriever's query cache, so a later search
+    for the same question reuses it.
+    
+    Parameters
+    ----------
+    question : str
+        Question text
+        
+    Returns
+    -------
+    List[float]
+        Embedding vector of the question
+    """
+    return _rag_resources()[3].embeddings.embed_query(question)
+
+
+def embed_documents(texts):
+    """
+    Embed a batch of texts with the RAG embedding model in one request.
+    
+    Parameters
+    ----------
+    texts : List[str]
+        Texts to embed (not added to the query cache)
+        
+    Returns
+    -------
+    List[List[float]]
+        One embedding vector per text
+    """
+    return _rag_resources()[0].embed_documents(list(texts))
+
+
+def get_last_context() -> str:
+    """
+    Return the context retrieved by the most recent ``rag_system`` call in this thread.
+    
+    Returns
+    -------
+    str
+        Formatted context passed to the LLM, or an empty string if the last
+        call did not produce one
+        
+    Notes
+    -----
+    Must be called from the thread that ran the crew (e.g. right after
+    ``crew.kickoff`` inside the same ``asyncio.to_thread`` call).
+    """
+    return getattr(_local, "context", "")
+
 
 
 @tool('rag_system')
@@ -149,26 +388,17 @@ def rag_system(question: str) -> str:
     - Model updates: Periodic embedding model refresh
     - Performance tuning: Monitor and adjust parameters
     """
+    _local.context = ""
     s = SETTINGS
-    embeddings = get_azure_embedding_model(s)  
-    llm = get_llm()  
-
-    client = get_qdrant_client(s)
-
-    retriever = SimpleRetriever(client, s, embeddings)
+    embeddings, llm, client, retriever = _rag_resources()
 
-    doc_folder = scan_docs_folder("src\\rag_flow\\tools\\rag_w_qdrant\\docs_test")
+    doc_folder = scan_docs_folder(_DOCS_DIR)
     #doc_folder = scan_docs_folder(r"C:\Users\KG376DF\OneDrive - EY\Desktop\python_scripts\AI-Academy-Project\rag_flow\src\rag_flow\tools\rag_w_qdrant\docs_test")
-    docs = load_documents(doc_folder)  
-    chunks = split_documents(docs, s)
-
-    vector_size = s.vector_size  
-    recreate_collection_for_rag(client, s, vector_size)
-
-    upsert_chunks(client, s, chunks, embeddings)
+    with _index_lock:
+        _ensure_index(client, s, embeddings, doc_folder)
 
     q = question
-    hits = hybrid_search(client, s, q, embeddings)
+    hits = hybrid_search(client, s, q, retriever.embeddings)
     if not hits:
         print("Nessun risultato.")
 
@@ -176,7 +406,8 @@ def rag_system(question: str) -> str:
     if llm:
         try:
             ctx = format_docs_for_prompt(hits)
-            with open("output/last_context.txt", "w", encoding="utf-8") as f:
+            _local.context = ctx
+            with _output_lock, open("output/last_context.txt", "w", encoding="utf-8") as f:
                 f.write(ctx)
             chain = build_rag_chain(llm)
             answer = chain.invoke({"question": q, "context": ctx})
@@ -196,12 +427,15 @@ def rag_system(question: str) -> str:
                 questions[3]: "Turbofan, Turboprop, Motori elettrici",
                 questions[4]: "Sustainable Aviation Fuel - carburanti sostenibili",
             }
+            # vettori delle domande di valutazione in una sola richiesta
+            retriever.embeddings.prefetch(questions)
             rag_eval = ragas_evaluation(
                 questions, chain, llm, embeddings, retriever, s, ground_truth
             )
 
             print("\n METRICHE OTTENUTE:\n", rag_eval)
-            rag_eval.to_json("output/rag_eval_results.json", orient="records", lines=True)
+            with _output_lock:
+                _write_json_lines(rag_eval, "output/rag_eval_results.json")
             return answer
         except Exception as e:
             print(f"\nLLM generation failed: {e}")
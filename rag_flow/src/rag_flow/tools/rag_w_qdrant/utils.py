@@ -1,6 +1,8 @@
 from __future__ import annotations
 
 import re
+import threading
+from collections import OrderedDict
 from pathlib import Path
 from typing import Iterable, List, Any
 import fitz  # PyMuPDF
@@ -696,3 +698,89 @@ class SimpleRetriever:
         """
         return self.get_relevant_documents(query)
 
+
+
+class CachedQueryEmbeddings:
+    """
+    Embedding model proxy that memoizes query vectors.
+    
+    Query embeddings are remote calls (Azure OpenAI), and the same query is
+    embedded several times per question: once for semantic search, once more
+    for MMR, and again by the RAGAS evaluation retriever. This proxy keeps
+    recently computed query vectors in an LRU map and lets callers embed many
+    queries with a single batched request.
+    
+    Attributes
+    ----------
+    embeddings : Any
+        Wrapped embedding model (HuggingFaceEmbeddings or AzureOpenAIEmbeddings)
+    maxsize : int
+        Maximum number of cached query vectors
+        
+    Notes
+    -----
+    Every other attribute (e.g. ``embed_documents``) is delegated to the
+    wrapped model, so the proxy can be passed wherever the model is expected
+    for retrieval. The cache is safe to share between threads.
+    """
+
+    def __init__(self, embeddings, maxsize: int = 512):
+        """
+        Wrap an embedding model.
+        
+        Parameters
+        ----------
+        embeddings : Any
+            Embedding model exposing ``embed_query`` and ``embed_documents``
+        maxsize : int, optional
+            Maximum number of cached query vectors (default: 512)
+        """
+        self.embeddings = embeddings
+        self.maxsize = maxsize
+        self._cache: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _store(self, text: str, vector: List[float]) -> None:
+        with self._lock:
+            self._cache[text] = vector
+            self._cache.move_to_end(text)
+            if len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+
+    def embed_query(self, text: str) -> List[float]:
+        """
+        Return the query vector, computing it only on a cache miss.
+        
+        Parameters
+        ----------
+        text : str
+            Query text
+            
+        Returns
+        -------
+        List[float]
+            Embedding vector of the query
+        """
+        vector = self._cache.get(text)
+        if vector is None:
+            vector = self.embeddings.embed_query(text)
+        self._store(text, vector)
+        return vector
+
+    def prefetch(self, texts: Iterable[str]) -> None:
+        """
+        Embed all uncached queries with a single batched request.
+        
+        Parameters
+        ----------
+        texts : Iterable[str]
+            Queries that are about to be searched
+        """
+        missing = list(dict.fromkeys(t for t in texts if t not in self._cache))
+        if not missing:
+            return
+        for text, vector in zip(missing, self.embeddings.embed_documents(missing)):
+            self._store(text, vector)
+
+    def __getattr__(self, name):
+        return getattr(self.embeddings, name)